@@ -0,0 +1,154 @@
+# benchmark.py
+#
+# Offline benchmark of every detector over the photo datasets captured with
+# photo.py (yolo/normal, yolo/light, yolo/shake). Headless: no camera,
+# display, GPIO or serial port is touched.
+#
+#   python benchmark.py [--detectors contour yolo:onnx ...] [--datasets normal shake]
+#                       [--limit 0] [--batch 32] [--threads 4] [--out results.json]
+#
+# Each (detector, dataset) pair runs in its own Python process: the contour
+# and yolo builds both have a config.py, and peak RSS is then per detector.
+# Images are read in batches decoded by a thread pool, then timed through
+# the detector one frame at a time. Results go to a JSON file (one per run,
+# timestamped by default) for comparison over time.
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+CODE_DIR  = Path(__file__).resolve().parent
+DATA_DIR  = CODE_DIR / "yolo"
+DATASETS  = ("normal", "light", "shake")
+DETECTORS = ("contour", "yolo:ultralytics", "yolo:onnx", "yolo:onnx_int8")
+FRAME_DT  = 1 / 30   # synthetic capture interval for the motion models
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def make_detector(detector: str):
+    """detector → callable(frame, timestamp) returning a Detection or None."""
+    build, _, backend = detector.partition(":")
+    sys.path.insert(0, str(CODE_DIR / build))
+    if build == "contour":
+        from track import Track
+        tracker = Track()
+        return lambda img, ts: tracker.track_frame(img, timestamp=ts)[0]
+    if build == "yolo":
+        from yolov8n import Yolov8n
+        model = Yolov8n(backend=backend)
+        model.warmup()
+        return lambda img, ts: model.track_frame(img, timestamp=ts)
+    raise ValueError(f"Unknown detector '{detector}' (expected one of {', '.join(DETECTORS)})")
+
+def load(path: Path):
+    import cv2
+    return cv2.imread(str(path))
+
+def batches(paths, size: int, threads: int):
+    """
+    Yield lists of decoded images, each batch decoded in parallel. Loading
+    never overlaps detection, so decoder threads don't skew the latencies.
+    """
+    with ThreadPoolExecutor(threads) as pool:
+        for i in range(0, len(paths), size):
+            yield [img for img in pool.map(load, paths[i:i+size]) if img is not None]
+
+def worker(detector: str, dataset: str, limit: int, batch: int, threads: int) -> dict:
+    """Run one detector over one dataset in this process; returns its stats."""
+    paths = sorted((DATA_DIR / dataset).glob("*.jpg"))
+    if limit:
+        paths = paths[:limit]
+    if not paths:
+        raise FileNotFoundError(f"No images in {DATA_DIR / dataset}")
+
+    detect = make_detector(detector)
+    lat, hits, n = [], 0, 0
+    for imgs in batches(paths, batch, threads):
+        for img in imgs:
+            start = time.perf_counter()
+            det   = detect(img, n * FRAME_DT)
+            lat.append((time.perf_counter() - start) * 1000.0)
+            hits += det is not None
+            n    += 1
+
+    # first frame excluded from the steady-state numbers
+    first, steady = lat[0], np.array(lat[1:] or lat)
+    return {
+        "frames":          n,
+        "detection_rate":  hits / n,
+        "throughput_fps":  float(1000.0 / steady.mean()),
+        "latency_p50_ms":  float(np.percentile(steady, 50)),
+        "latency_p95_ms":  float(np.percentile(steady, 95)),
+        "latency_p99_ms":  float(np.percentile(steady, 99)),
+        "latency_mean_ms": float(steady.mean()),
+        "first_frame_ms":  first,
+        "peak_rss_mb":     peak_rss_mb(),
+    }
+
+def run(detector: str, dataset: str, args) -> dict:
+    """Spawn a worker process for one (detector, dataset) pair."""
+    cmd = [sys.executable, __file__, "--worker", detector, "--dataset", dataset,
+           "--limit", str(args.limit), "--batch", str(args.batch), "--threads", str(args.threads)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    entry = {"detector": detector, "dataset": dataset}
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        err = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return {**entry, "error": err}
+    return {**entry, **json.loads(lines[-1])}
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline detector benchmark over the photo datasets")
+    parser.add_argument("--detectors", nargs="+", default=list(DETECTORS), metavar="DETECTOR",
+                        help=f"any of: {', '.join(DETECTORS)}")
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS), choices=DATASETS)
+    parser.add_argument("--limit",   type=int, default=0,  help="images per dataset (0 = all)")
+    parser.add_argument("--batch",   type=int, default=32, help="images decoded per batch")
+    parser.add_argument("--threads", type=int, default=4,  help="image loader threads")
+    parser.add_argument("--out",     type=Path, default=None,
+                        help="JSON output (default benchmark-<timestamp>.json)")
+    parser.add_argument("--worker",  help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.dataset, args.limit, args.batch, args.threads)))
+        return
+
+    stamp   = time.strftime("%Y%m%d-%H%M%S")
+    results = {
+        "timestamp": stamp,
+        "host":      platform.node(),
+        "machine":   platform.machine(),
+        "python":    platform.python_version(),
+        "runs":      [],
+    }
+    print(f"{'detector':18} {'dataset':8} {'fps':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'p99 ms':>7} {'det %':>6} {'RSS MB':>7}")
+    for detector in args.detectors:
+        for dataset in args.datasets:
+            r = run(detector, dataset, args)
+            results["runs"].append(r)
+            if "error" in r:
+                print(f"{detector:18} {dataset:8} skipped: {r['error']}")
+                continue
+            print(f"{detector:18} {dataset:8} {r['throughput_fps']:7.1f} {r['latency_p50_ms']:7.2f} "
+                  f"{r['latency_p95_ms']:7.2f} {r['latency_p99_ms']:7.2f} "
+                  f"{100*r['detection_rate']:6.1f} {r['peak_rss_mb']:7.1f}")
+
+    out = args.out or Path(f"benchmark-{stamp}.json")
+    out.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# aio.py
+
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pipeline import Packet
+
+class Slot:
+    """
+    asyncio counterpart of pipeline.Mailbox: put() replaces an untaken item
+    (counted in `dropped`), get() awaits an item and takes it. Loop thread
+    only.
+    """
+
+    def __init__(self, name: str):
+        self.name    = name
+        self.dropped = 0
+        self._item   = None
+        self._event  = asyncio.Event()
+
+    def put(self, item):
+        if self._item is not None:
+            self.dropped += 1
+        self._item = item
+        self._event.set()
+
+    async def get(self):
+        await self._event.wait()
+        self._event.clear()
+        item, self._item = self._item, None
+        return item
+
+class AsyncRuntime:
+    """
+    Capture → detect → act → show as tasks on one asyncio event loop on
+    the main thread (so cv2.imshow stays there). Capture and detection
+    block, so each is awaited in its own single-thread executor; act and
+    show run on the loop itself, and the serial sensor (Sensor created
+    with threaded=False) is read on fd readiness by its run_async() task.
+    Stale frames are dropped, never queued.
+
+    Every stage is timed, and a monitor task measures how late the loop
+    wakes it (loop lag); both are logged every stats_interval_s. A capture
+    that takes longer than capture_timeout_s, a failing stage or the end
+    of a replayed source stops the runtime: the other tasks are cancelled
+    and the executors shut down.
+    """
+
+    LAG_PERIOD = 0.05   # s between loop-lag probes
+
+    def __init__(self, capture, detect, act, show, sensor=None,
+                 capture_timeout_s: float = 2.0, stats_interval_s: float = 10.0):
+        self._capture        = capture
+        self._detect         = detect
+        self._act            = act
+        self._show           = show
+        self._sensor         = sensor
+        self.capture_timeout = capture_timeout_s
+        self._running        = False
+
+        # stats
+        self.captured     = 0
+        self.acted        = 0
+        self._ages        = []
+        self._times       = {"capture": [], "detect": [], "act": [], "show": [], "lag": []}
+        self._stats_every = stats_interval_s
+        self._last_stats  = time.time()
+
+    def run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._cam_pool = ThreadPoolExecutor(1, "capture")
+        self._det_pool = ThreadPoolExecutor(1, "detect")
+        self.frames    = Slot("capture→detect")
+        self.results   = Slot("detect→control")
+        self.display   = Slot("control→display")
+
+        stages = {"capture": self._capture_task(), "detect":  self._detect_task(),
+                  "control": self._act_task(),     "display": self._show_task(),
+                  "monitor": self._monitor_task()}
+        if self._sensor is not None:
+            stages["sensor"] = self._sensor.run_async()
+        self._running = True
+        tasks = [asyncio.create_task(coro, name=name) for name, coro in stages.items()]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if not t.cancelled() and t.exception() is not None:
+                    logging.error(f"Runtime task '{t.get_name()}' failed", exc_info=t.exception())
+        finally:
+            # wait_for() may swallow a cancel that races its inner future
+            # finishing: the stage loops also check _running, and tasks are
+            # cancelled again until every one has ended
+            self._running = False
+            pending = set(tasks)
+            while pending:
+                for t in pending:
+                    t.cancel()
+                _, pending = await asyncio.wait(pending, timeout=0.5)
+            for name, pool in (("capture", self._cam_pool), ("detect", self._det_pool)):
+                try:
+                    # a capture or detection still running gets 2 s to finish
+                    await asyncio.wait_for(
+                        asyncio.to_thread(pool.shutdown, True, cancel_futures=True), 2.0)
+                except asyncio.TimeoutError:
+                    logging.warning(f"{name} thread did not finish")
+
+    def _timed(self, stage: str, start: float):
+        self._times[stage].append(time.perf_counter() - start)
+
+    async def _capture_task(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            start = time.perf_counter()
+            try:
+                frame = await asyncio.wait_for(
+                    loop.run_in_executor(self._cam_pool, self._capture), self.capture_timeout)
+            except asyncio.TimeoutError:
+                logging.error(f"No frame within {self.capture_timeout:g} s, stopping")
+                return
+            if frame is None:
+                # end of a replayed source
+                return
+            self._timed("capture", start)
+            self.captured += 1
+            self.frames.put(Packet(self.captured, frame, time.time()))
+
+    async def _detect_task(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            pkt   = await self.frames.get()
+            start = time.perf_counter()
+            await loop.run_in_executor(self._det_pool, self._detect, pkt)
+            self._timed("detect", start)
+            self.results.put(pkt)
+
+    async def _act_task(self):
+        while self._running:
+            pkt   = await self.results.get()
+            start = time.perf_counter()
+            self._act(pkt)
+            self._timed("act", start)
+            self.acted += 1
+            self._ages.append(time.time() - pkt.t_capture)
+            self.display.put(pkt)
+            self._log_stats()
+
+    async def _show_task(self):
+        while self._running:
+            pkt   = await self.display.get()
+            start = time.perf_counter()
+            if self._show(pkt) is False:
+                return
+            self._timed("show", start)
+
+    async def _monitor_task(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            start = loop.time()
+            await asyncio.sleep(self.LAG_PERIOD)
+            self._times["lag"].append(loop.time() - start - self.LAG_PERIOD)
+
+    def _log_stats(self):
+        now = time.time()
+        if now - self._last_stats < self._stats_every or not self._ages:
+            return
+        ages = sorted(self._ages)
+        timings = []
+        for stage, t in self._times.items():
+            if t:
+                t.sort()
+                timings.append(f"{stage} {1000*t[len(t)//2]:.1f}/{1000*t[-1]:.1f}")
+                t.clear()
+        logging.info(
+            f"Runtime: captured {self.captured}, acted {self.acted} | dropped "
+            + ", ".join(f"{s.name} {s.dropped}" for s in (self.frames, self.results, self.display))
+            + f" | frame age at control: median {1000*ages[len(ages)//2]:.0f} ms, "
+              f"max {1000*ages[-1]:.0f} ms | median/max ms: " + ", ".join(timings)
+        )
+        self._ages.clear()
+        self._last_stats = now
@@ -0,0 +1,169 @@
+# bench.py
+#
+# Offline micro-benchmarks for the contour tracker, run against the photo
+# datasets captured with yolo/photo.py (no camera or GPIO needed).
+#
+#   python bench.py segment [--bits 6] [--limit 200]
+#   python bench.py reacquire [--factors 1 4 8]
+#   python bench.py roi [--fps 30]
+#   python bench.py backend
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config  import HSV_LOWER, HSV_UPPER, KERNEL_SIZE, LUT_BITS, CAMERA_FRAMERATE
+from segment import HsvSegmenter, LutSegmenter
+from track   import Track
+
+DATASET_ROOT = Path(__file__).resolve().parent.parent / "yolo"
+DATASETS     = ("normal", "light", "shake")
+
+def load_images(name: str, limit: int):
+    paths = sorted((DATASET_ROOT / name).glob("*.jpg"))[:limit]
+    return [img for img in (cv2.imread(str(p)) for p in paths) if img is not None]
+
+def time_per_frame(fn, images) -> float:
+    """Mean milliseconds per call of fn over images (after one warm-up call)."""
+    fn(images[0])
+    start = time.perf_counter()
+    for img in images:
+        fn(img)
+    return (time.perf_counter() - start) * 1000.0 / len(images)
+
+def cmd_segment(args):
+    """HSV (cvtColor+inRange) vs LUT segmenter: speed and mask agreement."""
+    kernel = cv2.getStructuringElement(cv2.MORPH_CROSS, KERNEL_SIZE)
+    hsv    = HsvSegmenter(HSV_LOWER, HSV_UPPER)
+    start  = time.perf_counter()
+    lut    = LutSegmenter(HSV_LOWER, HSV_UPPER, args.bits)
+    build  = (time.perf_counter() - start) * 1000.0
+    print(f"LUT build ({args.bits} bits/channel): {build:.1f} ms, {lut.table.nbytes/1024:.0f} KiB")
+    print(f"{'dataset':8} {'frames':>6} {'hsv ms':>8} {'lut ms':>8} {'speedup':>8} "
+          f"{'agree %':>8} {'IoU %':>7} {'closed IoU %':>12}")
+
+    for name in DATASETS:
+        images = load_images(name, args.limit)
+        if not images:
+            print(f"{name:8} (no images)")
+            continue
+        t_hsv = time_per_frame(hsv.mask, images)
+        t_lut = time_per_frame(lut.mask, images)
+
+        agree, inter, union, c_inter, c_union = 0.0, 0, 0, 0, 0
+        for img in images:
+            ref = hsv.mask(img) > 0
+            out = lut.mask(img) > 0
+            agree += np.count_nonzero(ref == out) / ref.size
+            inter += np.count_nonzero(ref & out)
+            union += np.count_nonzero(ref | out)
+            ref_c  = cv2.morphologyEx(ref.view(np.uint8), cv2.MORPH_CLOSE, kernel) > 0
+            out_c  = cv2.morphologyEx(out.view(np.uint8), cv2.MORPH_CLOSE, kernel) > 0
+            c_inter += np.count_nonzero(ref_c & out_c)
+            c_union += np.count_nonzero(ref_c | out_c)
+
+        iou   = 100.0 * inter / union if union else 100.0
+        c_iou = 100.0 * c_inter / c_union if c_union else 100.0
+        print(f"{name:8} {len(images):6d} {t_hsv:8.2f} {t_lut:8.2f} {t_hsv/t_lut:7.2f}x "
+              f"{100.0*agree/len(images):8.3f} {iou:7.2f} {c_iou:12.2f}")
+
+def cmd_reacquire(args):
+    """Lost-target search cost: full frame vs pyramid factors, every frame cold."""
+    print(f"{'dataset':8} {'factor':>6} {'ms':>7} {'found %':>8} {'centroid err px':>16}")
+    for name in DATASETS:
+        images = load_images(name, args.limit)
+        if not images:
+            print(f"{name:8} (no images)")
+            continue
+        ref_centers = None
+        for f in args.factors:
+            tracker = Track(pyramid=f)
+
+            def search(img):
+                tracker.prev_bbox = None
+                return tracker.track_frame(img)[0]
+
+            ms      = time_per_frame(search, images)
+            centers = [b.centroid if b is not None else None
+                       for b in map(search, images)]
+            found   = sum(c is not None for c in centers)
+            if ref_centers is None:
+                ref_centers = centers
+            errs = [np.hypot(c[0] - r[0], c[1] - r[1])
+                    for c, r in zip(centers, ref_centers) if c and r]
+            err  = f"{np.mean(errs):16.2f}" if errs else f"{'-':>16}"
+            print(f"{name:8} {f:6d} {ms:7.2f} {100.0*found/len(images):8.1f} {err}")
+
+def cmd_roi(args):
+    """ROI hit rate on the recorded sequences: fixed margin vs Kalman prediction."""
+    print(f"{'dataset':8} {'mode':>9} {'ROI hits':>12} {'hit %':>7} {'ms':>6}")
+    for name in DATASETS:
+        images = load_images(name, args.limit)
+        if not images:
+            print(f"{name:8} (no images)")
+            continue
+        for predict in (False, True):
+            tracker = Track(predict=predict)
+            start   = time.perf_counter()
+            for i, img in enumerate(images):
+                tracker.track_frame(img, timestamp=i / args.fps)
+            ms   = (time.perf_counter() - start) * 1000.0 / len(images)
+            hits, tries = tracker.roi_hits, tracker.roi_attempts
+            mode = "kalman" if predict else "fixed"
+            print(f"{name:8} {mode:>9} {f'{hits}/{tries}':>12} "
+                  f"{100.0*hits/max(tries, 1):7.1f} {ms:6.2f}")
+
+def cmd_backend(args):
+    """Per-frame tracking cost: findContours vs connectedComponentsWithStats."""
+    print(f"{'dataset':8} {'backend':>10} {'ms':>6} {'+contour ms':>12} {'found %':>8}")
+    for name in DATASETS:
+        images = load_images(name, args.limit)
+        if not images:
+            print(f"{name:8} (no images)")
+            continue
+        for backend in ("contours", "components"):
+            tracker = Track(backend=backend)
+            ms      = time_per_frame(lambda img: tracker.track_frame(img), images)
+            tracker = Track(backend=backend)
+
+            def with_contour(img):
+                blob = tracker.track_frame(img)[0]
+                return blob.contour if blob is not None else None
+
+            ms_draw = time_per_frame(with_contour, images)
+            found   = sum(Track(backend=backend).track_frame(img)[0] is not None for img in images)
+            print(f"{name:8} {backend:>10} {ms:6.2f} {ms_draw:12.2f} "
+                  f"{100.0*found/len(images):8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Contour tracker benchmarks")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    seg = sub.add_parser("segment", help="HSV vs LUT segmentation")
+    seg.add_argument("--bits",  type=int, default=LUT_BITS, help="LUT bits per channel")
+    seg.add_argument("--limit", type=int, default=500,      help="max images per dataset")
+    seg.set_defaults(func=cmd_segment)
+
+    acq = sub.add_parser("reacquire", help="full-frame vs pyramid lost-target search")
+    acq.add_argument("--factors", type=int, nargs="+", default=[1, 4, 8],
+                     help="pyramid factors (first one is the reference)")
+    acq.add_argument("--limit",   type=int, default=500, help="max images per dataset")
+    acq.set_defaults(func=cmd_reacquire)
+
+    roi = sub.add_parser("roi", help="ROI hit rate, fixed margin vs Kalman")
+    roi.add_argument("--fps",   type=float, default=CAMERA_FRAMERATE, help="sequence frame rate")
+    roi.add_argument("--limit", type=int,   default=500, help="max images per dataset")
+    roi.set_defaults(func=cmd_roi)
+
+    be = sub.add_parser("backend", help="findContours vs connected components")
+    be.add_argument("--limit", type=int, default=500, help="max images per dataset")
+    be.set_defaults(func=cmd_backend)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
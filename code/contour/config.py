@@ -60,6 +60,14 @@ PWM_PINS         = tuple(_data["motor"]["pwm_pins"])
 HSV_LOWER   = tuple(_data["tracker"]["hsv_lower"])
 HSV_UPPER   = tuple(_data["tracker"]["hsv_upper"])
 KERNEL_SIZE = tuple(_data["tracker"]["kernel_size"])
+TRACK_BACKEND = _data["tracker"]["backend"]
+SEGMENTER   = _data["tracker"]["segmenter"]
+LUT_BITS    = int(_data["tracker"]["lut_bits"])
+PYRAMID_FACTOR = int(_data["tracker"]["pyramid_factor"])
+PREDICT_ROI    = bool(_data["tracker"]["predict_roi"])
+KALMAN_PROCESS_NOISE     = float(_data["tracker"]["kalman_process_noise"])
+KALMAN_MEASUREMENT_NOISE = float(_data["tracker"]["kalman_measurement_noise"])
+ROI_SIGMA      = float(_data["tracker"]["roi_sigma"])
 
 # --- Draw settings ---
 GRID_COLOR      = tuple(_data["draw"]["grid_color"])
@@ -85,6 +93,7 @@ AVOID_MIN_TIME              = float(_data["control"]["avoid_min_time_s"])
 # --- dynamic sensor‐read interval bounds (already present) ---
 BASE_SENSOR_INTERVAL        = float(_data["control"]["base_sensor_interval_s"])
 MIN_SENSOR_INTERVAL         = float(_data["control"]["min_sensor_interval_s"])
+LOOKAHEAD_TIME              = float(_data["control"]["lookahead_s"])
 
 
 
@@ -109,13 +118,43 @@ def rotate_labels(labels):
             out[i][j] = labels[ri][rj]
     return out
 
+# --- Frame source ---
+SOURCE_KIND     = _data["source"]["kind"]
+SOURCE_PATH     = Path(__file__).resolve().parent / _data["source"]["path"]
+SOURCE_REALTIME = bool(_data["source"]["realtime"])
+SOURCE_LOOP     = bool(_data["source"]["loop"])
+SIMULATE_HARDWARE = bool(_data["source"]["simulate_hardware"])
+
+# --- Display / preview ---
+DISPLAY_HEADLESS  = bool(_data["display"]["headless"])
+PREVIEW_ENABLED   = bool(_data["display"]["preview"]["enabled"])
+PREVIEW_PORT      = int(_data["display"]["preview"]["port"])
+PREVIEW_EVERY_N   = int(_data["display"]["preview"]["every_n"])
+PREVIEW_MAX_FPS   = float(_data["display"]["preview"]["max_fps"])
+PREVIEW_QUALITY   = int(_data["display"]["preview"]["quality"])
+
+# --- Recording ---
+RECORD_ENABLED    = bool(_data["record"]["enabled"])
+RECORD_DIR        = Path(__file__).resolve().parent / _data["record"]["dir"]
+RECORD_FOURCC     = _data["record"]["fourcc"]
+RECORD_FPS        = float(_data["record"]["fps"])
+RECORD_SEGMENT_S  = float(_data["record"]["segment_s"])
+RECORD_QUEUE_SIZE = int(_data["record"]["queue_size"])
+
+# --- Runtime ---
+RUNTIME_MODE            = _data["runtime"]["mode"]
+RUNTIME_CAPTURE_TIMEOUT = float(_data["runtime"]["capture_timeout_s"])
+
 # --- Serial + Sensor polling ---
 SERIAL_PORT      = _data["serial"]["port"]
 SERIAL_BAUDRATE  = int(_data["serial"]["baudrate"])
 SERIAL_TIMEOUT_S = float(_data["serial"]["timeout_s"])
+SERIAL_PROTOCOL  = _data["serial"]["protocol"]
 
 SENSOR_NUM      = int(_data["sensor_read"]["num_sensors"])
 SENSOR_INTERVAL = float(_data["sensor_read"]["interval_s"])
+SENSOR_HISTORY  = int(_data["sensor_read"]["history"])
+SENSOR_MAX_AGE  = float(_data["sensor_read"]["max_age_s"])
 SENSOR_LABELS   = tuple(_data["sensor_read"]["labels"])
 
 # --- Grid→sensor map ---
@@ -2,10 +2,12 @@
 
 import time
 import logging
+import numpy as np
 
 from sensor    import Sensor
 from track     import Track
 from direction import Direction
+from detection import Detection, grid_cell
 from config    import (
     PROXIMITY_LIMIT,
     SENSOR_NUM,
@@ -17,6 +19,8 @@ from config    import (
     CLEAR_THRESHOLD,
     BASE_SENSOR_INTERVAL,
     MIN_SENSOR_INTERVAL,
+    SENSOR_MAX_AGE,
+    LOOKAHEAD_TIME,
     AVOID_MIN_TIME,
     rotate_index,
     SENSOR_MAP,
@@ -25,13 +29,21 @@ from config    import (
 class Control:
     """
     - 3-sensor groups per heading (CRITICAL_GUARDS).
-    - Dynamic read interval ∈ [MIN, BASE], but MIN when in AVOID.
+    - Dynamic read interval ∈ [MIN, BASE], but MIN when in AVOID; the
+      Sensor polls at that interval, and entering AVOID requests a sweep.
     - Follow-speed ∈ [0–100%] ∝ min(group_distance)/PROXIMITY_LIMIT.
     - Hard-stop → AVOID if any group sensor ≤ CRITICAL_DISTANCE.
     - Center cell (1,1) → only stop (no AVOID) until fish moves.
     - Remain in AVOID ≥ AVOID_MIN_TIME before FOLLOW.
     - Debounced FOLLOW⇄AVOID via STATE_DEBOUNCE_INTERVAL & CLEAR_THRESHOLD.
     - Centroid smoothing via CENTROID_SMOOTHING_ALPHA.
+    - No sweep for SENSOR_MAX_AGE (checked every call) means the link has
+      stalled: smoothing restarts and every sensor counts as blocked. A
+      per-sensor Err (no echo: nothing in range) keeps its previous value,
+      or inf before the first good one; with
+      LOOKAHEAD_TIME > 0 the hard-stop also fires on the distance
+      extrapolated from each sensor's closing rate.
+    - Optional Track reference exposes its filtered position/velocity.
     """
 
     CRITICAL_GUARDS = {
@@ -46,14 +58,18 @@ class Control:
         (2,0): [(0,2),(2,1),(1,0)],
         (2,2): [(0,0),(2,1),(1,2)],
     }
+    STALE_DISTANCE = 0.0   # cm used for every sensor while the link is stalled: blocked
 
-    def __init__(self):
-        self.sensor            = Sensor()
+    def __init__(self, tracker: Track = None, sensor: Sensor = None):
+        self.sensor            = sensor or Sensor()
+        self.tracker           = tracker
         self.limit             = PROXIMITY_LIMIT
 
         # sensor‐read timing
         self._read_interval    = BASE_SENSOR_INTERVAL
         self._last_read_time   = 0.0
+        self._last_sweep       = 0
+        self._stale            = False
 
         # logging helper
         self._last_action_msg  = None
@@ -67,25 +83,24 @@ class Control:
         self._state_time       = 0.0
         self._clear_count      = 0
 
-    def move(self, frame, contour):
+    def move(self, frame, det: Detection):
         now = time.time()
 
+        # 0) Link freshness, every call: a stalled link sends no sweeps
+        history = self.sensor.history
+        latest  = history.latest()
+        stale   = latest is None or time.monotonic() - latest[2] > SENSOR_MAX_AGE
+        self._check_link(stale)
+
         # 1) Fish detection → raw heading cell
-        if contour is None:
+        if det is None:
             self._enter_avoid(now)
             Direction.stop()
             return self._log("[BRAITE] No contour")
 
-        x, y = Track.contour_center(contour)
-        if x is None or y is None:
-            self._enter_avoid(now)
-            Direction.stop()
-            return self._log("[BRAITE] Centroid failed")
-
+        x, y     = det.centroid
         h, w     = frame.shape[:2]
-        raw_r    = max(0, min(2, int(y / (h/3))))
-        raw_c    = max(0, min(2, int(x / (w/3))))
-        raw_cell = rotate_index(raw_r, raw_c)
+        raw_cell = rotate_index(*det.cell)
 
         # 1a) Center-cell override: stop only
         if raw_cell == (1,1):
@@ -94,7 +109,7 @@ class Control:
 
         # 2) Compute ratio from heading group
         idxs      = Control.CRITICAL_GUARDS.get(raw_cell, [])
-        dists     = self._sensor_smoothed or [self.limit]*SENSOR_NUM
+        dists     = self._guarded(stale)
         group_min = min(dists[i] for i in idxs) if idxs else self.limit
         ratio     = max(0.0, min(1.0, group_min / self.limit))
 
@@ -106,11 +121,15 @@ class Control:
                 MIN_SENSOR_INTERVAL,
                 BASE_SENSOR_INTERVAL * ratio
             )
+        if self._read_interval != self.sensor.interval:
+            self.sensor.set_interval(self._read_interval)
 
-        # 3) Read & smooth sensors when due
-        if now - self._last_read_time >= self._read_interval:
-            raw_vals = self.sensor.get()
+        # 3) Read & smooth the newest sweep when due (Err stays Err)
+        if now - self._last_read_time >= self._read_interval and history.count != self._last_sweep:
+            d, err, _ = history.latest()
+            raw_vals  = np.where(err, -1.0, d).tolist()
             self._last_read_time = now
+            self._last_sweep     = history.count
 
             if self._sensor_smoothed is None:
                 # first time: Err→inf, else raw
@@ -137,12 +156,19 @@ class Control:
                 for lab, dist in zip(SENSOR_LABELS, self._sensor_smoothed)
             ))
 
-        dists = self._sensor_smoothed or [float('inf')]*SENSOR_NUM
+        dists = self._guarded(stale)
 
         # 4) Hard-stop → enter AVOID if any critical sensor ≤ CRITICAL_DISTANCE
         if any(dists[i] <= CRITICAL_DISTANCE for i in idxs):
             self._enter_avoid(now)
 
+        # 4a) … or if the closing rate brings one there within LOOKAHEAD_TIME
+        elif LOOKAHEAD_TIME > 0 and idxs:
+            rate = history.rate()
+            if any(dists[i] + rate[i] * LOOKAHEAD_TIME <= CRITICAL_DISTANCE
+                   for i in idxs if rate[i] < 0):
+                self._enter_avoid(now)
+
         # 5) Global stop if all directions blocked
         if all(d < self.limit for d in dists):
             self._enter_avoid(now)
@@ -175,9 +201,7 @@ class Control:
             self._cx = self._cx*αc + x*(1-αc)
             self._cy = self._cy*αc + y*(1-αc)
 
-        sm_r = max(0, min(2, int(self._cy / (h/3))))
-        sm_c = max(0, min(2, int(self._cx / (w/3))))
-        smooth_cell = rotate_index(sm_r, sm_c)
+        smooth_cell = rotate_index(*grid_cell(self._cx, self._cy, w, h))
         follow_speed = int(ratio * 100)
 
         # 8) Execute movement
@@ -214,12 +238,37 @@ class Control:
         ACTIONS.get(smooth_cell, Direction.stop)(follow_speed)
         return self._log(f"[FISH] Move {smooth_cell} @ {follow_speed}%")
 
+    def fish_motion(self):
+        """Filtered fish (position, velocity) from the tracker, or (None, None)."""
+        if self.tracker is None:
+            return None, None
+        return self.tracker.position, self.tracker.velocity
+
+    def _check_link(self, stale: bool):
+        """Restart smoothing while the link is stalled; log on changes."""
+        if stale:
+            self._sensor_smoothed = None
+        if stale != self._stale:
+            if stale:
+                logging.warning(f"No sensor sweep for {SENSOR_MAX_AGE:g} s: "
+                                "all sensors treated as blocked")
+            else:
+                logging.info("Sensor sweeps resumed")
+            self._stale = stale
+
+    def _guarded(self, stale: bool):
+        """Smoothed distances for decisions; all STALE_DISTANCE while stalled."""
+        if stale:
+            return [Control.STALE_DISTANCE]*SENSOR_NUM
+        return self._sensor_smoothed or [float('inf')]*SENSOR_NUM
+
     def _enter_avoid(self, now):
         """Switch to AVOID and reset timers."""
         if self.state != 'AVOID':
             self.state        = 'AVOID'
             self._state_time  = now
             self._clear_count = 0
+            self.sensor.request()
 
     def _log(self, msg):
         """Log only on action transitions."""
@@ -0,0 +1,45 @@
+# detection.py
+
+import cv2
+
+def grid_cell(x: float, y: float, w: int, h: int):
+    """(row, col) of point (x, y) in the 3×3 grid of a w×h frame (image space)."""
+    return (max(0, min(2, int(y / (h/3)))),
+            max(0, min(2, int(x / (w/3)))))
+
+class Detection:
+    """
+    Per-frame fish detection, computed once by Track and shared by Control
+    and Draw: centroid (x, y), bbox (x, y, w, h), area (px), confidence,
+    grid cell (row, col) in image space and capture timestamp (s).
+    The contour polygon and its convex hull are built on first access.
+    """
+    __slots__ = ("centroid", "bbox", "area", "confidence", "cell", "timestamp",
+                 "_blob", "_contour", "_hull")
+
+    def __init__(self, centroid, bbox, area, confidence, cell, timestamp, blob=None):
+        self.centroid   = centroid
+        self.bbox       = bbox
+        self.area       = area
+        self.confidence = confidence
+        self.cell       = cell
+        self.timestamp  = timestamp
+        self._blob      = blob
+        self._contour   = None
+        self._hull      = None
+
+    @property
+    def contour(self):
+        if self._contour is None and self._blob is not None:
+            self._contour = self._blob.contour
+        return self._contour
+
+    @property
+    def hull(self):
+        if self._hull is None and self.contour is not None:
+            self._hull = cv2.convexHull(self._contour)
+        return self._hull
+
+    def __repr__(self):
+        return (f"Detection(centroid={self.centroid}, bbox={self.bbox}, area={self.area:.0f}, "
+                f"confidence={self.confidence:.2f}, cell={self.cell})")
@@ -2,7 +2,7 @@
 
 import cv2
 import numpy as np
-from track import Track
+from detection import Detection
 from config import (
     GRID_COLOR, TEXT_COLOR, FPS_COLOR,
     FONT_SCALE, THICKNESS, QUADRANT_LABELS,
@@ -19,66 +19,69 @@ class Draw:
         self.thk        = THICKNESS
         self.labels     = rotate_labels(QUADRANT_LABELS)
 
-        # Precompute grid lines for resolution
+        # Static overlay (grid + labels), built once per frame size
         w, h = CAMERA_RESOLUTION
-        thirds = (w//3, h//3)
-        self._grid_lines = []
-        for i in (1, 2):
-            # horizontal
-            y = i * h // 3
-            self._grid_lines.append(((0, y), (w, y)))
-            # vertical
-            x = i * w // 3
-            self._grid_lines.append(((x, 0), (x, h)))
-
-        # Precompute label positions and text sizes
-        self._labels = []
-        for i, row in enumerate(self.labels):
-            for j, text in enumerate(row):
-                cx = int((j + 0.5) * w / 3)
-                cy = int((i + 0.5) * h / 3)
-                (tw, th), _ = cv2.getTextSize(text, self.font, self.scale, self.thk)
-                org = (cx - tw//2, cy + th//2)
-                self._labels.append((text, org))
+        self._build_static(w, h)
 
         # Fixed origin for fish‐coordinates display
         self._coord_origin = (10, 30)
 
-    def render(self, frame: np.ndarray, contour: np.ndarray, mask: np.ndarray, fps: float):
-        # 1) Draw grid
-        for pt1, pt2 in self._grid_lines:
-            cv2.line(frame, pt1, pt2, self.grid_color, 2)
+        # FPS text is left-aligned at the widest value's origin, so its
+        # size is measured once instead of every frame
+        (tw, _), _ = cv2.getTextSize("FPS: 000.0", self.font, self.scale, self.thk)
+        self._fps_dx = tw + 10
+
+    def _build_static(self, w: int, h: int):
+        """
+        Draw the grid lines and quadrant labels once into a BGR layer plus
+        a mask of their pixels; render() composites it with one masked copy.
+        """
+        self._overlay      = np.zeros((h, w, 3), np.uint8)
+        self._overlay_mask = np.zeros((h, w), np.uint8)
+        for layer, grid, text in ((self._overlay, self.grid_color, self.text_color),
+                                  (self._overlay_mask, 255, 255)):
+            for i in (1, 2):
+                cv2.line(layer, (0, i * h // 3), (w, i * h // 3), grid, 2)   # horizontal
+                cv2.line(layer, (i * w // 3, 0), (i * w // 3, h), grid, 2)   # vertical
+            for i, row in enumerate(self.labels):
+                for j, label in enumerate(row):
+                    cx = int((j + 0.5) * w / 3)
+                    cy = int((i + 0.5) * h / 3)
+                    (tw, th), _ = cv2.getTextSize(label, self.font, self.scale, self.thk)
+                    cv2.putText(layer, label, (cx - tw//2, cy + th//2), self.font, self.scale,
+                                text, self.thk, cv2.LINE_AA)
+        # anti-aliased edges: keep the pixels that are mostly text
+        self._overlay_mask[self._overlay_mask < 128] = 0
 
-        # 2) Draw quadrant labels
-        for text, org in self._labels:
-            cv2.putText(frame, text, org, self.font, self.scale, self.text_color, self.thk, cv2.LINE_AA)
+    def render(self, frame: np.ndarray, det: Detection, mask: np.ndarray, fps: float):
+        h, w = frame.shape[:2]
+        if self._overlay.shape[:2] != (h, w):
+            self._build_static(w, h)
+
+        # 1-2) Composite the cached grid + quadrant labels
+        cv2.copyTo(self._overlay, self._overlay_mask, frame)
 
         # 3) Draw contour & centroid
-        if contour is not None:
-            hull = cv2.convexHull(contour)
-            cv2.drawContours(frame, [hull], -1, self.grid_color, 1)
+        if det is not None:
+            cv2.drawContours(frame, [det.hull], -1, self.grid_color, 1)
 
-            x, y = Track.contour_center(contour)
-            if x is not None and y is not None:
-                cv2.circle(frame, (x, y), 5, (0,0,255), -1)
-                # 4) Draw fish coordinates
-                coord_text = f"X:{x}  Y:{y}"
-                cv2.putText(
-                    frame,
-                    coord_text,
-                    self._coord_origin,
-                    self.font,
-                    self.scale,
-                    self.text_color,
-                    self.thk,
-                    cv2.LINE_AA
-                )
+            x, y = det.centroid
+            cv2.circle(frame, (x, y), 5, (0,0,255), -1)
+            # 4) Draw fish coordinates
+            coord_text = f"X:{x}  Y:{y}"
+            cv2.putText(
+                frame,
+                coord_text,
+                self._coord_origin,
+                self.font,
+                self.scale,
+                self.text_color,
+                self.thk,
+                cv2.LINE_AA
+            )
 
         # 5) Draw FPS (bottom‐right)
-        fps_text = f"FPS: {fps:.1f}"
-        (tw, th), _ = cv2.getTextSize(fps_text, self.font, self.scale, self.thk)
-        h, w = frame.shape[:2]
-        org = (w - tw - 10, h - 10)
-        cv2.putText(frame, fps_text, org, self.font, self.scale, self.fps_color, self.thk, cv2.LINE_AA)
+        cv2.putText(frame, f"FPS: {fps:.1f}", (w - self._fps_dx, h - 10), self.font, self.scale,
+                    self.fps_color, self.thk, cv2.LINE_AA)
 
         return frame, mask
@@ -0,0 +1,122 @@
+# fake_gpio.py
+#
+# Stand-in for RPi.GPIO so the build runs off the robot (main.py installs
+# it with source.simulate_hardware). Covers the calls the builds make and
+# simulates an HC-SR04 on every trigger/echo pair: a 10 µs trigger
+# pulse raises the echo ~0.5 ms later, for as long as the sound takes to
+# travel to the set distance and back. Edges reach add_event_detect()
+# callbacks on a separate thread, like the real library's.
+#
+#   import fake_gpio
+#   fake_gpio.install()               # before anything imports RPi.GPIO
+#   fake_gpio.hcsr04(5, 6, 42.0)      # trigger pin, echo pin, cm
+#   fake_gpio.set_distance(6, None)   # later: no echo at all (timeout)
+
+import sys
+import time
+import types
+import threading
+
+BCM, BOARD       = 11, 10
+OUT, IN          = 0, 1
+LOW, HIGH        = 0, 1
+RISING, FALLING  = 31, 32
+BOTH             = 33
+PUD_OFF          = 20
+
+SOUND_CM_S   = 34300
+ECHO_DELAY_S = 0.0005   # trigger fall → echo rise on the HC-SR04
+
+_levels    = {}   # pin → level
+_callbacks = {}   # pin → [callback(channel)]
+_distances = {}   # echo pin → cm, None for no echo
+_pairs     = {}   # trigger pin → echo pin
+_lock      = threading.Lock()
+
+def hcsr04(trig: int, echo: int, cm=100.0):
+    """Simulate an HC-SR04 on these pins, `cm` away from an obstacle."""
+    _pairs[trig]     = echo
+    _distances[echo] = cm
+
+def set_distance(echo: int, cm):
+    """Distance seen by the sensor wired to `echo` (None: echo never comes)."""
+    _distances[echo] = cm
+
+def setwarnings(flag):
+    pass
+
+def setmode(mode):
+    pass
+
+def setup(channel, direction, initial=None, pull_up_down=PUD_OFF):
+    _levels[channel] = LOW if initial is None else initial
+
+def input(channel):
+    return _levels.get(channel, LOW)
+
+def output(channel, value):
+    value = HIGH if value else LOW
+    prev  = _levels.get(channel, LOW)
+    _levels[channel] = value
+    if prev == HIGH and value == LOW and channel in _pairs:
+        _echo(_pairs[channel])
+
+def _edge(channel, value):
+    with _lock:
+        _levels[channel] = value
+        callbacks = list(_callbacks.get(channel, ()))
+    for cb in callbacks:
+        cb(channel)
+
+def _pulse(echo: int, width: float):
+    time.sleep(ECHO_DELAY_S)
+    _edge(echo, HIGH)
+    time.sleep(width)
+    _edge(echo, LOW)
+
+def _echo(echo: int):
+    cm = _distances.get(echo, 100.0)
+    if cm is not None:
+        threading.Thread(target=_pulse, args=(echo, 2 * cm / SOUND_CM_S), daemon=True).start()
+
+def add_event_detect(channel, edge, callback=None, bouncetime=None):
+    with _lock:
+        _callbacks[channel] = [callback] if callback else []
+
+def add_event_callback(channel, callback):
+    with _lock:
+        _callbacks.setdefault(channel, []).append(callback)
+
+def remove_event_detect(channel):
+    with _lock:
+        _callbacks.pop(channel, None)
+
+def cleanup(channel=None):
+    with _lock:
+        _levels.clear()
+        _callbacks.clear()
+
+class PWM:
+    def __init__(self, channel, frequency):
+        self.channel   = channel
+        self.frequency = frequency
+        self.duty      = 0.0
+
+    def start(self, duty):
+        self.duty = duty
+
+    def ChangeDutyCycle(self, duty):
+        self.duty = duty
+
+    def ChangeFrequency(self, frequency):
+        self.frequency = frequency
+
+    def stop(self):
+        pass
+
+def install():
+    """Register this module as RPi.GPIO for every later import."""
+    rpi      = types.ModuleType("RPi")
+    rpi.GPIO = sys.modules[__name__]
+    sys.modules["RPi"]      = rpi
+    sys.modules["RPi.GPIO"] = sys.modules[__name__]
@@ -0,0 +1,79 @@
+# kalman.py
+
+import cv2
+import numpy as np
+
+class Kalman:
+    """
+    Constant-velocity Kalman filter on the fish centroid.
+    State (x, y, vx, vy) in px and px/s; measurement (x, y) in px.
+    Process noise follows the white-acceleration model, scaled by dt.
+    """
+
+    def __init__(self, process_noise: float, measurement_noise: float):
+        self.q  = process_noise
+        self.kf = cv2.KalmanFilter(4, 2)
+        self.kf.measurementMatrix   = np.array([[1, 0, 0, 0],
+                                                [0, 1, 0, 0]], np.float32)
+        self.kf.measurementNoiseCov = np.eye(2, dtype=np.float32) * measurement_noise**2
+        self.initialized = False
+        self.last_time   = None
+
+    def reset(self):
+        self.initialized = False
+        self.last_time   = None
+
+    def predict(self, now: float):
+        """Advance the state to `now`; returns predicted (x, y) or None."""
+        if not self.initialized:
+            return None
+        dt = max(now - self.last_time, 1e-3)
+        self.last_time = now
+
+        self.kf.transitionMatrix = np.array([[1, 0, dt, 0],
+                                             [0, 1, 0, dt],
+                                             [0, 0, 1,  0],
+                                             [0, 0, 0,  1]], np.float32)
+        dt2, dt3, dt4 = dt*dt, dt**3, dt**4
+        q = np.array([[dt4/4, 0,     dt3/2, 0    ],
+                      [0,     dt4/4, 0,     dt3/2],
+                      [dt3/2, 0,     dt2,   0    ],
+                      [0,     dt3/2, 0,     dt2  ]], np.float32)
+        self.kf.processNoiseCov = q * self.q**2
+        state = self.kf.predict()
+        return float(state[0, 0]), float(state[1, 0])
+
+    def correct(self, x: float, y: float, now: float):
+        """Fuse a measured centroid (initializes the filter on first call)."""
+        if not self.initialized:
+            self.kf.statePost     = np.array([[x], [y], [0], [0]], np.float32)
+            self.kf.errorCovPost  = np.diag([self.kf.measurementNoiseCov[0, 0]] * 2
+                                            + [1e4, 1e4]).astype(np.float32)
+            self.kf.statePre      = self.kf.statePost.copy()
+            self.kf.errorCovPre   = self.kf.errorCovPost.copy()
+            self.initialized = True
+            self.last_time   = now
+            return
+        self.kf.correct(np.array([[x], [y]], np.float32))
+
+    @property
+    def position(self):
+        """Filtered (x, y) or None."""
+        if not self.initialized:
+            return None
+        s = self.kf.statePost
+        return float(s[0, 0]), float(s[1, 0])
+
+    @property
+    def velocity(self):
+        """Filtered (vx, vy) in px/s or None."""
+        if not self.initialized:
+            return None
+        s = self.kf.statePost
+        return float(s[2, 0]), float(s[3, 0])
+
+    @property
+    def sigma(self):
+        """1-σ position uncertainty (sx, sy) of the last prediction."""
+        p = self.kf.errorCovPre
+        return float(np.sqrt(p[0, 0])), float(np.sqrt(p[1, 1]))
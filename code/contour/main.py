@@ -1,11 +1,24 @@
 import logging
 import cv2
-import RPi.GPIO as GPIO
 import time
 
-from picamera2 import Picamera2
-
-from config    import setup_logging, CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE
+from config    import (setup_logging, CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE,
+                       RUNTIME_MODE, RUNTIME_CAPTURE_TIMEOUT, SOURCE_KIND, SOURCE_PATH,
+                       SOURCE_REALTIME, SOURCE_LOOP, SIMULATE_HARDWARE, DISPLAY_HEADLESS,
+                       PREVIEW_ENABLED, PREVIEW_PORT, PREVIEW_EVERY_N, PREVIEW_MAX_FPS,
+                       PREVIEW_QUALITY, RECORD_ENABLED, RECORD_DIR, RECORD_FOURCC,
+                       RECORD_FPS, RECORD_SEGMENT_S, RECORD_QUEUE_SIZE, SERIAL_PORT)
+if SIMULATE_HARDWARE:
+    # off the robot: fake RPi.GPIO before anything imports the real one
+    import fake_gpio
+    fake_gpio.install()
+import RPi.GPIO as GPIO
+from source    import make_source
+from preview   import MjpegPreview
+from recorder  import Recorder
+from pipeline  import Pipeline, Packet
+from aio       import AsyncRuntime
+from sensor    import Sensor, start_fake_mega
 from track     import Track
 from draw      import Draw
 from control   import Control
@@ -17,67 +30,107 @@ class Main:
         logging.info("Initialization successful.")
 
         self.tracker    = Track()
-        self.control = Control()
+        self.fake_mega  = None
+        port            = SERIAL_PORT
+        if SIMULATE_HARDWARE:
+            self.fake_mega, port = start_fake_mega()
+        self.control = Control(self.tracker, Sensor(threaded=RUNTIME_MODE != "asyncio", port=port))
         self.drawer     = Draw()
+        self.preview    = None
+        if PREVIEW_ENABLED:
+            self.preview = MjpegPreview(self._render_copy, PREVIEW_PORT, PREVIEW_EVERY_N,
+                                        PREVIEW_MAX_FPS, PREVIEW_QUALITY)
+        self.recorder   = None
+        if RECORD_ENABLED:
+            self.recorder = Recorder(RECORD_DIR, RECORD_FPS, RECORD_FOURCC,
+                                     RECORD_SEGMENT_S, RECORD_QUEUE_SIZE)
 
-        # Configure & start camera entirely from config
-        self.camera = Picamera2()
-        self.camera.configure(
-            self.camera.create_preview_configuration(
-                main     = {"format": CAMERA_FORMAT, "size": CAMERA_RESOLUTION},
-                controls = {"FrameRate": CAMERA_FRAMERATE}
-            )
-        )
+        # Configure & start the frame source (camera or replay) from config
+        self.camera = make_source(SOURCE_KIND, SOURCE_PATH, SOURCE_REALTIME, SOURCE_LOOP,
+                                  CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE)
         self.camera.start()
-        logging.info("Camera started")
-        '''
-             #comeca
-    
-    picamv2= Picamera2()
-    picamv2.configure(picamv2.create_video_configuration())
-    picamv2.start()
-    time.sleep(2)
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    out = cv2.VideoWriter('output.avi',fourcc,20,(640,480))
-    start = time.time()
-           
-    print("gravando")
-    while time.time() - start < 180:
-        frame = picamv2.capture_array()
-        frame = cv2.resize(frame, (640,480))
-        out.write(frame)
-                 
-    out.release()
-    picamv2.stop()
-    print("Video salvo")
-             
-            #termina
-'''
+
+    # --- stages (shared by the serial loop and the pipelined / asyncio runtimes) ---
+    def _capture(self):
+        return self.camera.read()
+
+    def _detect(self, pkt: Packet):
+        # 1) FPS tracking moved into Track
+        pkt.fps, _ = self.tracker.track_fps()
+
+        # 2) Detection
+        pkt.det, pkt.mask = self.tracker.track_frame(pkt.frame, timestamp=pkt.t_capture)
+
+    def _act(self, pkt: Packet):
+        # 3) Movement
+        self.control.move(pkt.frame, pkt.det)
+
+    def _render(self, pkt: Packet, frame=None):
+        frame = pkt.frame if frame is None else frame
+        out, bin_mask = self.drawer.render(frame, pkt.det, pkt.mask, pkt.fps)
+        return out
+
+    def _render_copy(self, pkt: Packet):
+        # preview thread: draw on a copy, the recorder may still hold pkt.frame
+        return self._render(pkt, pkt.frame.copy())
+
+    def _show(self, pkt: Packet) -> bool:
+        # headless: no overlays or window, the preview renders off-thread
+        if DISPLAY_HEADLESS:
+            if self.recorder:
+                self.recorder.write(pkt.frame)
+            if self.preview:
+                self.preview.offer(pkt)
+            return True
+
+        # 4) Draw overlays (instantaneous FPS only)
+        out = self._render(pkt)
+        if self.recorder:
+            self.recorder.write(out)
+        if self.preview:
+            self.preview.offer(pkt, out)
+
+        # 5) Display
+        #cv2.imshow("BINARY", self.tracker.full_mask())
+        cv2.imshow("MAIN",   out)
+        return cv2.waitKey(1) == -1
+
     def run(self):
-        while True:
-            frame = self.camera.capture_array()
-            
-            # 1) FPS tracking moved into Track
-            inst_fps, _ = self.tracker.track_fps()
-
-            # 2) Detection + movement
-            contour, mask = self.tracker.track_frame(frame)
-            self.control.move(frame, contour)
-
-            # 3) Draw overlays (instantaneous FPS only)
-            out, bin_mask = self.drawer.render(frame, contour, mask, inst_fps)
-
-            # 4) Display
-            #cv2.imshow("BINARY", bin_mask)
-            cv2.imshow("MAIN",   out)
-            if cv2.waitKey(1) != -1:
-                break
-                
-       
-        self.camera.stop()
-        cv2.destroyAllWindows()
-        GPIO.cleanup()
-        
+        try:
+            if RUNTIME_MODE == "asyncio":
+                logging.info("Runtime: asyncio event loop")
+                AsyncRuntime(self._capture, self._detect, self._act, self._show,
+                             self.control.sensor, RUNTIME_CAPTURE_TIMEOUT).run()
+            elif RUNTIME_MODE == "pipelined":
+                logging.info("Runtime: pipelined capture/detect/control threads")
+                Pipeline(self._capture, self._detect, self._act, self._show).run()
+            else:
+                seq = 0
+                while True:
+                    frame = self._capture()
+                    if frame is None:
+                        break
+                    seq += 1
+                    pkt = Packet(seq, frame, time.time())
+                    self._detect(pkt)
+                    self._act(pkt)
+                    if not self._show(pkt):
+                        break
+        except KeyboardInterrupt:
+            logging.info("Interrupted")
+        finally:
+            if self.preview:
+                self.preview.close()
+            if self.recorder:
+                self.recorder.close()
+            self.camera.stop()
+            if not DISPLAY_HEADLESS:
+                cv2.destroyAllWindows()
+            self.control.sensor.stop()
+            if self.fake_mega:
+                self.fake_mega.terminate()
+            GPIO.cleanup()
+
 
 if __name__ == "__main__":
     Main().run()
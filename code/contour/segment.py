@@ -0,0 +1,74 @@
+# segment.py
+
+import logging
+import cv2
+import numpy as np
+
+class HsvSegmenter:
+    """
+    Reference segmenter: BGR→HSV with cv2.cvtColor, then cv2.inRange.
+    """
+
+    def __init__(self, lower, upper):
+        self.set_bounds(lower, upper)
+
+    def set_bounds(self, lower, upper):
+        self.lower = tuple(int(v) for v in lower)
+        self.upper = tuple(int(v) for v in upper)
+
+    def mask(self, img: np.ndarray) -> np.ndarray:
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, self.lower, self.upper)
+
+class LutSegmenter:
+    """
+    Lookup-table segmenter: every BGR channel is quantized to `bits` bits
+    and the packed index selects a precomputed mask value, so no colour
+    conversion runs per frame. The table is built once from the centre of
+    each quantization bin and rebuilt whenever the HSV bounds change.
+    """
+
+    def __init__(self, lower, upper, bits: int = 6):
+        if not 1 <= bits <= 8:
+            raise ValueError(f"LUT bits must be in [1, 8], got {bits}")
+        self.bits  = bits
+        self.shift = 8 - bits
+        self.lower = None
+        self.upper = None
+        self.table = None
+        self.set_bounds(lower, upper)
+
+    def set_bounds(self, lower, upper):
+        """Rebuild the table if the HSV bounds differ from the current ones."""
+        lower = tuple(int(v) for v in lower)
+        upper = tuple(int(v) for v in upper)
+        if (lower, upper) == (self.lower, self.upper):
+            return
+        self.lower, self.upper = lower, upper
+        self.table = self._build()
+        logging.info(f"LUT segmenter built: {self.table.size} entries ({self.bits} bits/channel)")
+
+    def _build(self) -> np.ndarray:
+        n    = 1 << self.bits
+        step = 1 << self.shift
+        vals = (np.arange(n) * step + step // 2).astype(np.uint8)
+        b, g, r = np.meshgrid(vals, vals, vals, indexing="ij")
+        bgr  = np.stack((b, g, r), axis=-1).reshape(1, -1, 3)
+        hsv  = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, self.lower, self.upper).reshape(-1)
+
+    def mask(self, img: np.ndarray) -> np.ndarray:
+        dtype = np.uint16 if 3 * self.bits <= 16 else np.uint32
+        q     = img >> self.shift
+        idx   = q[..., 0].astype(dtype) << (2 * self.bits)
+        idx  |= q[..., 1].astype(dtype) << self.bits
+        idx  |= q[..., 2]
+        return np.take(self.table, idx)
+
+def make_segmenter(kind: str, lower, upper, bits: int = 6):
+    """Build the segmenter selected by tracker.segmenter in config.yaml."""
+    if kind == "hsv":
+        return HsvSegmenter(lower, upper)
+    if kind == "lut":
+        return LutSegmenter(lower, upper, bits)
+    raise ValueError(f"Unknown segmenter '{kind}' (expected 'hsv' or 'lut')")
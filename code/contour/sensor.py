@@ -1,62 +1,351 @@
 # sensor.py
 
+import sys
+import asyncio
 import threading
+import struct
 import time
 import logging
 import serial
+import subprocess
+from pathlib import Path
+import numpy as np
 from config import (
     SERIAL_PORT,
     SERIAL_BAUDRATE,
     SERIAL_TIMEOUT_S,
+    SERIAL_PROTOCOL,
     SENSOR_NUM,
-    SENSOR_INTERVAL
+    SENSOR_INTERVAL,
+    SENSOR_HISTORY
 )
 
+# Binary packet pushed by mega.ino after every sweep (little-endian):
+# sync 0xA5 0x5A | uint16 seq | uint32 sweep millis | int16[N] mm | uint16 sum
+SYNC   = b"\xA5\x5A"
+PACKET = struct.Struct(f"<2sHI{SENSOR_NUM}hH")
+
+# a forward seq jump up to this counts as lost packets; a larger one (or a
+# backward step) means the Mega restarted its count: a resync
+MAX_SEQ_GAP = 256
+
+class SensorHistory:
+    """
+    Fixed-size NumPy ring buffer of the last `size` sweeps: distances (cm,
+    NaN where the reading failed), error masks and time.monotonic() stamps.
+    One writer (the reader thread) fills a row, then publishes it by
+    bumping `count`, so readers never see a half-written sweep.
+
+    latest() hands out read-only views into the ring (no copy); a row is
+    only overwritten `size` sweeps later, so use it right away.
+    """
+
+    def __init__(self, size: int, n: int):
+        self.size     = size
+        self.count    = 0                                  # sweeps ever pushed
+        self._d       = np.full((size, n), np.nan, np.float32)
+        self._err     = np.ones((size, n), bool)
+        self._t       = np.zeros(size, np.float64)
+        self._valid_t = np.full(n, -np.inf)                # last good reading per sensor
+        self._valid_d = np.full(n, np.nan, np.float32)
+
+    def push(self, distances, t: float = None):
+        """Store one sweep (cm, negative = error) taken at monotonic time t."""
+        t   = time.monotonic() if t is None else t
+        i   = self.count % self.size
+        d   = np.asarray(distances, np.float32)
+        err = d < 0
+        self._d[i]   = np.where(err, np.nan, d)
+        self._err[i] = err
+        self._t[i]   = t
+        ok = ~err
+        self._valid_t[ok] = t
+        self._valid_d[ok] = d[ok]
+        self.count += 1
+
+    @staticmethod
+    def _view(a):
+        v = a.view()
+        v.flags.writeable = False
+        return v
+
+    def latest(self):
+        """(distances, error_mask, t) of the newest sweep as views, or None."""
+        if not self.count:
+            return None
+        i = (self.count - 1) % self.size
+        return self._view(self._d[i]), self._view(self._err[i]), float(self._t[i])
+
+    def last_valid(self):
+        """Newest good distance per sensor (NaN if never read)."""
+        return self._view(self._valid_d)
+
+    def age(self, now: float = None):
+        """Seconds since each sensor's last good reading (inf if never)."""
+        now = time.monotonic() if now is None else now
+        return now - self._valid_t
+
+    def window(self, seconds: float = None, n: int = None, now: float = None):
+        """
+        Recent sweeps, oldest first: (t, distances, error_mask), limited to
+        the last n sweeps and/or the last `seconds`. Views while the window
+        doesn't wrap around the ring, copies otherwise.
+        """
+        k = min(self.count, self.size if n is None else min(n, self.size))
+        end   = self.count % self.size
+        start = end - k
+        if start >= 0:
+            t, d, err = self._t[start:end], self._d[start:end], self._err[start:end]
+        else:
+            idx = np.arange(start, end) % self.size
+            t, d, err = self._t[idx], self._d[idx], self._err[idx]
+        if seconds is not None and k:
+            now   = time.monotonic() if now is None else now
+            first = np.searchsorted(t, now - seconds)
+            t, d, err = t[first:], d[first:], err[first:]
+        return t, d, err
+
+    def rate(self, seconds: float = 0.5, now: float = None):
+        """
+        Per-sensor rate of change (cm/s, negative = closing in) from a
+        least-squares line over the last `seconds`; NaN with < 2 readings.
+        """
+        t, d, err = self.window(seconds, now=now)
+        ok  = ~err
+        cnt = ok.sum(axis=0)
+        if len(t) < 2:
+            return np.full(self._d.shape[1], np.nan)
+        tc  = (t - t.mean())[:, None]
+        dz  = np.where(ok, d, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tm  = (tc * ok).sum(axis=0) / cnt
+            dm  = dz.sum(axis=0) / cnt
+            cov = (ok * (tc - tm) * (dz - dm)).sum(axis=0)
+            var = (ok * (tc - tm) ** 2).sum(axis=0)
+            return np.where(cnt >= 2, cov / var, np.nan)
+
 class Sensor:
     """
     Background reader for SENSOR_NUM ultrasonic sensors
-    from an Arduino Mega over USB. Sends 'R' every SENSOR_INTERVAL
-    seconds, parses a line of 'x.x;y.y;Err;…', and stores floats (Err→-1.0).
+    from an Arduino Mega over USB. Sends 'R' every `interval` seconds
+    (SENSOR_INTERVAL until set_interval() is called), parses a line of
+    'x.x;y.y;Err;…', and stores floats (Err→-1.0). request() asks for a
+    sweep right away instead of waiting out the interval.
+    With serial.protocol "binary" the Mega instead pushes a fixed-size
+    packet per sweep (no request round-trip), checked and decoded here.
+    Every sweep is also kept, timestamped, in `history` (SensorHistory).
+
+    With threaded=False no thread is started: the asyncio runtime awaits
+    run_async() instead, which reads on fd readiness.
     """
 
-    def __init__(self):
+    def __init__(self, threaded: bool = True, port: str = SERIAL_PORT):
         try:
             self.ser = serial.Serial(
-                SERIAL_PORT,
+                port,
                 SERIAL_BAUDRATE,
                 timeout=SERIAL_TIMEOUT_S
             )
         except serial.SerialException as e:
-            logging.error(f"Cannot open serial {SERIAL_PORT}: {e}")
+            logging.error(f"Cannot open serial {port}: {e}")
             raise
 
         time.sleep(2)  # allow Arduino reset
         self.distances = [-1.0] * SENSOR_NUM
-        self._stop = threading.Event()
-        threading.Thread(target=self._read_loop, daemon=True).start()
+        self.history   = SensorHistory(SENSOR_HISTORY, SENSOR_NUM)
+        self.interval  = SENSOR_INTERVAL
+        self._stop     = threading.Event()
+        self._wake     = threading.Event()
+        self._forced   = False   # request() pending
+
+        # binary stream state
+        self.seq       = None   # last packet sequence number
+        self.sweep_ms  = None   # Mega millis() at the end of that sweep
+        self.rx_time   = None   # host time.time() when it was decoded
+        self.packets   = 0
+        self.bad       = 0      # checksum failures
+        self.lost      = 0      # sequence gaps
+        self.dups      = 0      # repeated seq
+        self.resyncs   = 0      # seq restarted (Mega reset) or jumped back
+
+        if SERIAL_PROTOCOL == "binary":
+            self.ser.reset_input_buffer()
+            self.ser.write(b'B')
+        if not threaded:
+            return
+        if SERIAL_PROTOCOL == "binary":
+            threading.Thread(target=self._stream_loop, daemon=True).start()
+        else:
+            threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _parse_line(self, line: str):
+        """Store one 'x.x;y.y;Err;…' reply (Err / unparsable → -1.0)."""
+        parts = line.split(';')
+        if len(parts) != SENSOR_NUM:
+            logging.warning(f"Expected {SENSOR_NUM} values, got {len(parts)}: {line}")
+            return
+        new = []
+        for p in parts:
+            if p.lower() == 'err':
+                new.append(-1.0)
+            else:
+                try:
+                    new.append(float(p))
+                except ValueError:
+                    new.append(-1.0)
+        self.distances = new
+        self.history.push(new)
 
     def _read_loop(self):
         while not self._stop.is_set():
+            # cleared before the sweep, so a request() during it isn't lost
+            self._wake.clear()
+            self._forced = False
+            last = time.monotonic()
             try:
                 self.ser.write(b'R')
-                line = self.ser.readline().decode(errors='ignore').strip()
-                parts = line.split(';')
-                if len(parts) == SENSOR_NUM:
-                    new = []
-                    for p in parts:
-                        if p.lower() == 'err':
-                            new.append(-1.0)
-                        else:
-                            try:
-                                new.append(float(p))
-                            except ValueError:
-                                new.append(-1.0)
-                    self.distances = new
+                self._parse_line(self.ser.readline().decode(errors='ignore').strip())
+            except Exception as e:
+                logging.error(f"Sensor read error: {e}")
+            # next sweep `interval` after this one, or at once on request()
+            while not self._stop.is_set() and not self._forced:
+                remaining = last + self.interval - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake.wait(remaining)
+                self._wake.clear()
+
+    def _decode(self, buf: bytearray) -> bytearray:
+        """Decode every complete packet in buf; returns the unconsumed tail."""
+        while True:
+            start = buf.find(SYNC)
+            if start < 0:
+                return buf[-1:]            # may hold the first sync byte
+            if len(buf) - start < PACKET.size:
+                return buf[start:]
+            raw = bytes(buf[start:start + PACKET.size])
+            _, seq, sweep_ms, *mm, checksum = PACKET.unpack(raw)
+            if sum(raw[2:-2]) & 0xFFFF != checksum:
+                # corrupt or false sync: resync one byte further on
+                self.bad += 1
+                buf = buf[start + 1:]
+                continue
+            if self.seq is not None:
+                gap = (seq - self.seq) & 0xFFFF
+                if gap == 0:
+                    self.dups += 1
+                elif gap <= MAX_SEQ_GAP:
+                    self.lost += gap - 1
                 else:
-                    logging.warning(f"Expected {SENSOR_NUM} values, got {len(parts)}: {line}")
+                    self.resyncs += 1
+            mm = np.array(mm, np.int16)
+            cm = np.where(mm < 0, -1.0, mm / 10.0)
+            self.history.push(cm)
+            self.distances = cm.tolist()
+            self.seq, self.sweep_ms, self.rx_time = seq, sweep_ms, time.time()
+            self.packets += 1
+            buf = buf[start + PACKET.size:]
+
+    def _stream_loop(self):
+        buf = bytearray()
+        while not self._stop.is_set():
+            try:
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+                if chunk:
+                    buf = self._decode(buf + chunk)
             except Exception as e:
                 logging.error(f"Sensor read error: {e}")
-            time.sleep(SENSOR_INTERVAL)
+                time.sleep(SENSOR_INTERVAL)
+
+    async def run_async(self):
+        """
+        Event-loop reader (threaded=False): the loop calls back when the
+        port has bytes, so nothing sleeps or blocks. In ASCII mode this
+        task sends 'R', awaits the reply (≤ SERIAL_TIMEOUT_S) and then the
+        interval; in binary mode it just keeps the reader installed. Runs
+        until cancelled, or raises the error when the port fails.
+        """
+        loop         = asyncio.get_running_loop()
+        self._fd     = self.ser.fileno()
+        self._wake   = asyncio.Event()
+        self._reply  = asyncio.Event()
+        self._rx     = bytearray()
+        self._failed = loop.create_future()   # set by _on_readable on a read error
+        loop.add_reader(self._fd, self._on_readable)
+        try:
+            if SERIAL_PROTOCOL == "binary":
+                await self._failed
+            poll = asyncio.create_task(self._poll_async(), name="sensor-poll")
+            try:
+                await asyncio.wait({poll, self._failed}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                poll.cancel()
+            if poll.done() and not poll.cancelled():
+                poll.result()
+            self._failed.result()
+        finally:
+            loop.remove_reader(self._fd)
+
+    async def _poll_async(self):
+        """ASCII requests for run_async(): 'R', reply, then the interval."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            self._forced = False
+            self._reply.clear()
+            last = loop.time()
+            self.ser.write(b'R')
+            try:
+                await asyncio.wait_for(self._reply.wait(), SERIAL_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                logging.warning(f"No sensor reply within {SERIAL_TIMEOUT_S:g} s")
+            while not self._forced:
+                remaining = last + self.interval - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    def _on_readable(self):
+        """Loop callback: take what the port has and decode it."""
+        try:
+            self._rx += self.ser.read(self.ser.in_waiting or 1)
+        except Exception as e:
+            # a dead port stays readable: stop watching it, end run_async()
+            logging.error(f"Sensor read error: {e}; serial reader stopped")
+            asyncio.get_running_loop().remove_reader(self._fd)
+            if not self._failed.done():
+                self._failed.set_exception(e)
+            return
+        if SERIAL_PROTOCOL == "binary":
+            self._rx = self._decode(self._rx)
+            return
+        *lines, self._rx = self._rx.split(b"\n")
+        for line in lines:
+            self._parse_line(line.decode(errors='ignore').strip())
+        if lines:
+            self._reply.set()
+
+    def set_interval(self, seconds: float):
+        """
+        Poll every `seconds`, counted from the last sweep. A shorter
+        interval wakes the reader to re-check its deadline, but never
+        sweeps sooner than `seconds` after the previous one (only request()
+        does). The binary stream is paced by the Mega's sweep, so there
+        this only records the value.
+        """
+        shorter       = seconds < self.interval
+        self.interval = seconds
+        if shorter:
+            self._wake.set()
+
+    def request(self):
+        """Ask for a fresh sweep now rather than at the end of the interval."""
+        self._forced = True
+        self._wake.set()
 
     def get(self) -> list[float]:
         """Return the latest distances list (cm)."""
@@ -65,7 +354,25 @@ class Sensor:
     def stop(self):
         """Stop background thread and close serial port."""
         self._stop.set()
+        self._wake.set()
+        if SERIAL_PROTOCOL == "binary":
+            logging.info(f"Sensor stream: {self.packets} packets, {self.bad} bad checksums, "
+                         f"{self.lost} lost, {self.dups} duplicates, {self.resyncs} resyncs")
         try:
+            if SERIAL_PROTOCOL == "binary":
+                self.ser.write(b'A')
             self.ser.close()
         except:
             pass
+
+def start_fake_mega():
+    """
+    Run code/mega/fake_mega.py on a pseudo-terminal for off-robot runs;
+    returns (process, port). Own session, so Ctrl+C reaches only us.
+    """
+    script = Path(__file__).resolve().parent.parent / "mega" / "fake_mega.py"
+    proc   = subprocess.Popen([sys.executable, str(script)], stdout=subprocess.PIPE,
+                              text=True, start_new_session=True)
+    port   = proc.stdout.readline().split()[-1]
+    logging.info(f"Simulated Mega on {port}")
+    return proc, port
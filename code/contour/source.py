@@ -0,0 +1,146 @@
+# source.py
+
+import time
+import logging
+from pathlib import Path
+import cv2
+
+class PicameraSource:
+    """
+    Live Picamera2 frames (format/size/framerate from config).
+
+    libcamera names formats by register order, so "RGB888" arrives in numpy
+    as B,G,R — exactly what OpenCV and the detectors expect, with no
+    conversion. "XRGB8888" (B,G,R,X in numpy) is still accepted and
+    converted to 3-channel BGR once, here.
+    """
+
+    NATIVE = "RGB888"
+
+    def __init__(self, fmt: str, size, framerate: float):
+        from picamera2 import Picamera2
+        self.strip_alpha = fmt == "XRGB8888"
+        if self.strip_alpha:
+            logging.warning(f"Camera format {fmt} needs a per-frame conversion; "
+                            f"use {self.NATIVE} for BGR frames straight from the camera")
+        elif fmt != self.NATIVE:
+            raise ValueError(f"Unsupported camera format '{fmt}' "
+                             f"(expected '{self.NATIVE}' or 'XRGB8888')")
+        self.camera = Picamera2()
+        self.camera.configure(
+            self.camera.create_preview_configuration(
+                main     = {"format": fmt, "size": size},
+                controls = {"FrameRate": framerate}
+            )
+        )
+
+    def start(self):
+        self.camera.start()
+        logging.info("Camera started")
+
+    def read(self):
+        frame = self.camera.capture_array()
+        if self.strip_alpha:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        return frame
+
+    def stop(self):
+        self.camera.stop()
+
+class _Replay:
+    """
+    Shared pacing for recorded sources. realtime=True releases frame i at
+    start + i/fps, like a camera would; False returns frames as fast as the
+    caller asks. read() returns None at the end (unless loop=True).
+    """
+
+    def __init__(self, fps: float, realtime: bool, loop: bool):
+        self.fps      = fps
+        self.realtime = realtime
+        self.loop     = loop
+        self.index    = 0
+        self._start   = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        logging.info(f"Replaying {self} ({'real-time' if self.realtime else 'as fast as possible'})")
+
+    def _pace(self):
+        if self.realtime:
+            due = self._start + self.index / self.fps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.index += 1
+
+    def read(self):
+        frame = self._next()
+        if frame is None and self.loop and self.index:
+            self._rewind()
+            frame = self._next()
+        if frame is not None:
+            self._pace()
+        return frame
+
+    def stop(self):
+        pass
+
+class VideoSource(_Replay):
+    """Frames of a video file, paced at its own FPS (or `fps`) when realtime."""
+
+    def __init__(self, path, realtime: bool = True, loop: bool = False, fps: float = None):
+        self.path = str(path)
+        self.cap  = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Cannot open video '{self.path}'")
+        super().__init__(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime, loop)
+
+    def _next(self):
+        ok, frame = self.cap.read()
+        return frame if ok else None
+
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def stop(self):
+        self.cap.release()
+
+    def __str__(self):
+        return f"video {self.path} @ {self.fps:.1f} FPS"
+
+class ImageDirSource(_Replay):
+    """Images of a folder (e.g. a photo.py dataset) in name order, as frames."""
+
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, path, fps: float, realtime: bool = True, loop: bool = False):
+        self.path  = Path(path)
+        self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in self.EXTENSIONS)
+        if not self.files:
+            raise FileNotFoundError(f"No images in '{self.path}'")
+        self._pos = 0
+        super().__init__(fps, realtime, loop)
+
+    def _next(self):
+        while self._pos < len(self.files):
+            frame = cv2.imread(str(self.files[self._pos]))
+            self._pos += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self._pos = 0
+
+    def __str__(self):
+        return f"{len(self.files)} images in {self.path} @ {self.fps:.1f} FPS"
+
+def make_source(kind: str, path, realtime: bool, loop: bool, fmt: str, size, framerate: float):
+    """Frame source selected by source.kind in config.yaml."""
+    if kind == "camera":
+        return PicameraSource(fmt, size, framerate)
+    if kind == "video":
+        return VideoSource(path, realtime, loop)
+    if kind == "images":
+        return ImageDirSource(path, framerate, realtime, loop)
+    raise ValueError(f"Unknown frame source '{kind}' (expected 'camera', 'video' or 'images')")
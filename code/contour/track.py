@@ -4,21 +4,89 @@ import numpy as np
 import logging
 from collections import deque
 from statistics     import median
-from config import HSV_LOWER, HSV_UPPER, KERNEL_SIZE
+from config import (HSV_LOWER, HSV_UPPER, KERNEL_SIZE, SEGMENTER, LUT_BITS, PYRAMID_FACTOR,
+                    PREDICT_ROI, KALMAN_PROCESS_NOISE, KALMAN_MEASUREMENT_NOISE,
+                    ROI_SIGMA, TRACK_BACKEND)
+from segment import make_segmenter
+from kalman  import Kalman
+from detection import Detection, grid_cell
+
+class Blob:
+    """
+    One segmented blob in full-frame coordinates: area, bbox (x,y,w,h) and
+    centroid (x,y). The contour polygon is built only when first asked for
+    (e.g. by Draw), from the blob's label image or its source contour.
+    """
+    __slots__ = ("area", "_bbox", "_centroid", "_contour", "_labels", "_label", "offset")
+
+    def __init__(self, area, bbox=None, centroid=None, contour=None,
+                 labels=None, label=None, offset=(0, 0)):
+        self.area      = float(area)
+        self._bbox     = bbox
+        self._centroid = centroid
+        self._contour  = contour
+        self._labels   = labels
+        self._label    = label
+        self.offset    = offset
+
+    @property
+    def bbox(self):
+        if self._bbox is None:
+            self._bbox = cv2.boundingRect(self._contour)
+        x, y, w, h = self._bbox
+        return (int(x) + self.offset[0], int(y) + self.offset[1], int(w), int(h))
+
+    @property
+    def centroid(self):
+        if self._centroid is None:
+            self._centroid = Track.contour_center(self._contour)
+        cx, cy = self._centroid
+        if cx is None:
+            return None, None
+        return int(cx) + self.offset[0], int(cy) + self.offset[1]
+
+    @property
+    def contour(self):
+        if self._contour is None:
+            x, y, w, h = self._bbox
+            crop = (self._labels[y:y+h, x:x+w] == self._label).astype(np.uint8)
+            cnts, _ = cv2.findContours(crop, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(int(x), int(y)))
+            self._contour = max(cnts, key=len)
+        return self._contour + np.array([self.offset])
 
 class Track:
     def __init__(self,
                  min_contour_area: float = 100.0,
                  roi_margin: int        = 20,
+                 pyramid: int           = PYRAMID_FACTOR,
+                 predict: bool          = PREDICT_ROI,
+                 backend: str           = TRACK_BACKEND,
                  fps_window_s: float    = 10.0):
         # HSV / morphology
         self.lower      = HSV_LOWER
         self.upper      = HSV_UPPER
         self.kernel     = cv2.getStructuringElement(cv2.MORPH_CROSS, KERNEL_SIZE)
+        self.segmenter  = make_segmenter(SEGMENTER, HSV_LOWER, HSV_UPPER, LUT_BITS)
         self.min_area   = min_contour_area
         self.roi_margin = roi_margin
+        self.pyramid    = pyramid
+        self.backend    = backend
         self.prev_bbox  = None
 
+        # Motion-predicted ROI (constant-velocity Kalman on the centroid)
+        self.kalman     = Kalman(KALMAN_PROCESS_NOISE, KALMAN_MEASUREMENT_NOISE) if predict else None
+        self.roi_sigma  = ROI_SIGMA
+
+        # Lazy full-frame mask (built only on fallback or on request)
+        self._frame          = None
+        self._mask_full      = None
+        self.frames          = 0
+        self.full_frame_runs = 0
+        self.pyramid_runs    = 0
+        self.roi_attempts    = 0
+        self.roi_hits        = 0
+
         # FPS tracking
         self.prev_time       = time.time()
         self.fps_history     = deque()
@@ -32,63 +100,149 @@ class Track:
             return int(M["m10"]/M["m00"]), int(M["m01"]/M["m00"])
         return None, None
 
+    def set_hsv(self, lower, upper):
+        """Change the HSV bounds (rebuilds the LUT segmenter if needed)."""
+        self.lower, self.upper = tuple(lower), tuple(upper)
+        self.segmenter.set_bounds(lower, upper)
+
     def _preprocess(self, img: np.ndarray) -> np.ndarray:
-        """One‐call BGR→HSV→mask→close pipeline."""
-        hsv  = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, self.lower, self.upper)
+        """One‐call BGR→mask→close pipeline."""
+        mask = self.segmenter.mask(img)
         return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
 
-    def _find_valid(self, mask: np.ndarray):
+    def _find_valid(self, mask: np.ndarray, min_area: float = None):
+        """Blobs with area ≥ min_area, in mask coordinates."""
+        min_area = self.min_area if min_area is None else min_area
+        if self.backend == "components":
+            # one pass: area, bbox and centroid for every blob
+            _, labels, stats, cents = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            keep = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= min_area) + 1
+            return [Blob(stats[i, cv2.CC_STAT_AREA], tuple(stats[i, :4]), tuple(cents[i]),
+                         labels=labels, label=i)
+                    for i in keep]
         cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        return [c for c in cnts if cv2.contourArea(c) >= self.min_area]
+        blobs = (Blob(cv2.contourArea(c), contour=c) for c in cnts)
+        return [b for b in blobs if b.area >= min_area]
+
+    def full_mask(self):
+        """
+        Full-frame mask of the last tracked frame, built on first request
+        and cached until the next call to track_frame.
+        """
+        if self._mask_full is None and self._frame is not None:
+            self._mask_full = self._preprocess(self._frame)
+            self.full_frame_runs += 1
+        return self._mask_full
+
+    @staticmethod
+    def _window(bbox, margin: int, w: int, h: int):
+        """bbox (x,y,w,h) grown by margin and clipped → (x0,y0,x1,y1)."""
+        x, y, bw, bh = bbox
+        return (max(x - margin, 0), max(y - margin, 0),
+                min(x + bw + margin, w), min(y + bh + margin, h))
 
-    def track_frame(self, frame: np.ndarray):
+    def _roi(self, now: float, w: int, h: int):
+        """
+        Next search window: centred on the Kalman-predicted centroid and
+        grown by roi_sigma·σ when prediction is on, else last bbox + margin.
+        """
+        pred = self.kalman.predict(now) if self.kalman else None
+        if pred is None:
+            return self._window(self.prev_bbox, self.roi_margin, w, h)
+        px, py = pred
+        sx, sy = self.kalman.sigma
+        _, _, bw, bh = self.prev_bbox
+        mx = bw / 2 + self.roi_margin + self.roi_sigma * sx
+        my = bh / 2 + self.roi_margin + self.roi_sigma * sy
+        return (max(int(px - mx), 0), max(int(py - my), 0),
+                min(int(px + mx) + 1, w), min(int(py + my) + 1, h))
+
+    @property
+    def position(self):
+        """Filtered centroid (x, y) in px, or None without prediction/target."""
+        return self.kalman.position if self.kalman else None
+
+    @property
+    def velocity(self):
+        """Filtered centroid velocity (vx, vy) in px/s, or None."""
+        return self.kalman.velocity if self.kalman else None
+
+    def _search_pyramid(self, frame: np.ndarray):
+        """
+        Coarse-to-fine search: segment a 1/pyramid downscaled frame, then
+        refine candidates (largest first) at full resolution inside their
+        window. Returns (valid_blobs, window_offset_or_None).
+        """
+        h, w  = frame.shape[:2]
+        f     = self.pyramid
+        # nearest = plain subsampling, far cheaper than INTER_AREA for a coarse pass
+        small = cv2.resize(frame, (w // f, h // f), interpolation=cv2.INTER_NEAREST)
+        cands = self._find_valid(self._preprocess(small), self.min_area / (f * f))
+        self.pyramid_runs += 1
+
+        for cand in sorted(cands, key=lambda b: b.area, reverse=True):
+            x, y, bw, bh = cand.bbox
+            x0, y0, x1, y1 = self._window((x*f, y*f, bw*f, bh*f), self.roi_margin + f, w, h)
+            found = self._find_valid(self._preprocess(frame[y0:y1, x0:x1]))
+            if found:
+                return found, (x0, y0)
+        return [], None
+
+    def track_frame(self, frame: np.ndarray, timestamp: float = None):
         """
         Detection pipeline with ROI‐fallback and area‐filter.
-        Returns (contour_or_None, full_frame_mask).
+        Returns (Detection_or_None, full_frame_mask_or_None); the mask is only
+        present when the full-frame path ran, otherwise see full_mask().
+        `timestamp` (s) drives the motion model; defaults to time.time().
         """
         h, w = frame.shape[:2]
-        roi_bounds = None
+        now  = time.time() if timestamp is None else timestamp
+        self.frames     += 1
+        self._frame     = frame
+        self._mask_full = None
 
         # 1) ROI
+        blobs, offset = [], None
         if self.prev_bbox:
-            x,y,bw,bh = self.prev_bbox
-            x0 = max(x - self.roi_margin, 0)
-            y0 = max(y - self.roi_margin, 0)
-            x1 = min(x + bw + self.roi_margin, w)
-            y1 = min(y + bh + self.roi_margin, h)
-            roi = frame[y0:y1, x0:x1]
-            roi_bounds = (x0, y0)
-        else:
-            roi = frame
-
-        # 2) Preprocess + find in ROI
-        mask_roi = self._preprocess(roi)
-        cnts     = self._find_valid(mask_roi)
-
-        # 3) Fallback to full frame
-        use_full = False
-        if not cnts:
-            mask_full = self._preprocess(frame)
-            cnts      = self._find_valid(mask_full)
-            use_full  = True
-        else:
-            mask_full = self._preprocess(frame)
+            x0, y0, x1, y1 = self._roi(now, w, h)
+            self.roi_attempts += 1
+
+            # 2) Preprocess + find in ROI
+            if x1 > x0 and y1 > y0:
+                blobs  = self._find_valid(self._preprocess(frame[y0:y1, x0:x1]))
+                offset = (x0, y0)
+            self.roi_hits += bool(blobs)
+
+        # 3) Fallback (only when the ROI missed or no ROI yet):
+        #    coarse-to-fine pyramid if enabled, else full frame
+        if not blobs:
+            if self.pyramid > 1:
+                blobs, offset = self._search_pyramid(frame)
+            else:
+                blobs, offset = self._find_valid(self.full_mask()), None
 
         # 4) Select largest
-        main = max(cnts, key=cv2.contourArea) if cnts else None
+        main = max(blobs, key=lambda b: b.area) if blobs else None
 
-        # 5) Update bounding box
+        # 5) Update bounding box + motion model, build the Detection
+        det = None
         if main is not None:
-            if roi_bounds and not use_full:
-                x0,y0 = roi_bounds
-                main = main + np.array([[x0,y0]])
-            x2,y2,w2,h2 = cv2.boundingRect(main)
-            self.prev_bbox = (x2,y2,w2,h2)
+            if offset:
+                main.offset = offset
+            self.prev_bbox = bx, by, bw, bh = main.bbox
+            cx, cy = main.centroid
+            if cx is None:
+                cx, cy = bx + bw // 2, by + bh // 2
+            if self.kalman:
+                self.kalman.correct(cx, cy, now)
+            det = Detection((cx, cy), self.prev_bbox, main.area, 1.0,
+                            grid_cell(cx, cy, w, h), now, blob=main)
         else:
             self.prev_bbox = None
+            if self.kalman:
+                self.kalman.reset()
 
-        return main, mask_full
+        return det, self._mask_full
 
     def track_fps(self):
         """
@@ -112,6 +266,18 @@ class Track:
             if vals:
                 med = median(vals)
                 logging.info(f"Median FPS (last {self.fps_window_s}s): {med:.1f}")
+            if self.frames:
+                logging.info(
+                    f"Full-frame path: {self.full_frame_runs}/{self.frames} frames "
+                    f"({100.0*self.full_frame_runs/self.frames:.1f}%), "
+                    f"pyramid: {self.pyramid_runs}/{self.frames}, "
+                    f"ROI hits: {self.roi_hits}/{self.roi_attempts}"
+                )
+            self.frames          = 0
+            self.full_frame_runs = 0
+            self.pyramid_runs    = 0
+            self.roi_attempts    = 0
+            self.roi_hits        = 0
             self.last_median_log = now
 
         return inst, med
@@ -0,0 +1,79 @@
+# fake_mega.py
+#
+# Stand-in for the Arduino Mega running mega.ino, on a pseudo-terminal, so
+# the serial Sensor can be exercised (and timed) without the robot.
+# Speaks both protocols: 'R' → ASCII line, 'B' / 'A' → start / stop the
+# binary packet stream. Distances wander randomly; some readings fail.
+#
+#   python fake_mega.py [--sweep-ms 60] [--errors 0.05] [--corrupt 0.0]
+#
+# Then set serial.port in code/contour/config.yaml to the printed path.
+
+import argparse
+import os
+import random
+import select
+import struct
+import time
+import tty
+
+NUM_SENSORS = 8
+
+def packet(seq: int, sweep_ms: int, mm) -> bytes:
+    body = struct.pack(f"<HI{NUM_SENSORS}h", seq & 0xFFFF, sweep_ms & 0xFFFFFFFF, *mm)
+    return b"\xA5\x5A" + body + struct.pack("<H", sum(body) & 0xFFFF)
+
+def ascii_line(mm) -> bytes:
+    return (";".join("Err" if d < 0 else f"{d // 10}.{d % 10}" for d in mm) + "\r\n").encode()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Arduino Mega sensor array on a pty")
+    parser.add_argument("--sweep-ms", type=float, default=60.0, help="time per 8-sensor sweep")
+    parser.add_argument("--errors",   type=float, default=0.05, help="chance a reading fails")
+    parser.add_argument("--corrupt",  type=float, default=0.0,  help="chance a packet is corrupted")
+    args = parser.parse_args()
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    print(f"Fake Mega on {os.ttyname(slave)}", flush=True)
+
+    t0        = time.monotonic()
+    true_mm   = [random.randint(200, 1500) for _ in range(NUM_SENSORS)]
+    mm        = list(true_mm)          # what the Mega reports (-1 = failed)
+    streaming = False
+    seq       = 0
+    next_due  = t0 + args.sweep_ms / 1000
+    try:
+        while True:
+            # serve commands until the current sweep "finishes"
+            timeout = max(next_due - time.monotonic(), 0)
+            ready, _, _ = select.select([master], [], [], timeout)
+            if ready:
+                for cmd in os.read(master, 64):
+                    if cmd == ord("B"):
+                        streaming = True
+                    elif cmd == ord("A"):
+                        streaming = False
+                    elif cmd == ord("R"):
+                        os.write(master, ascii_line(mm))
+                continue
+
+            # sweep done: obstacles drift, some readings fail; pushed at
+            # once when streaming
+            next_due += args.sweep_ms / 1000
+            true_mm = [max(20, min(2000, d + random.randint(-30, 30))) for d in true_mm]
+            mm      = [-1 if random.random() < args.errors else d for d in true_mm]
+            if streaming:
+                data = bytearray(packet(seq, int((time.monotonic() - t0) * 1000), mm))
+                if random.random() < args.corrupt:
+                    data[random.randrange(2, len(data))] ^= 0xFF
+                os.write(master, bytes(data))
+                seq += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+
+if __name__ == "__main__":
+    main()
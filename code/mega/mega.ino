@@ -6,11 +6,23 @@
  * distances from 8 ultrasonic sensors and sends the collected data over USB
  * serial when it receives a specific character ('R') from the host.
  *
- * Communication Protocol:
+ * Communication Protocol (ASCII, default after reset):
  * - Host sends: 'R' (char)
  * - Arduino replies: A single line string with 8 distance values (in cm, with
  * one decimal place), separated by semicolons. e.g., "15.2;30.0;Err;..."
  * "Err" indicates a timeout or failed reading for that sensor.
+ *
+ * Binary streaming protocol:
+ * - Host sends 'B' to start streaming, 'A' to return to ASCII mode.
+ * - After every completed sweep the Arduino pushes one 26-byte packet,
+ *   little-endian, without waiting for a request:
+ *
+ *     offset  size  field
+ *     0       2     sync bytes 0xA5 0x5A
+ *     2       2     uint16 sequence number (wraps)
+ *     4       4     uint32 sweep timestamp, millis() when the sweep ended
+ *     8       16    int16[8] distances in mm (-1 = timeout / error)
+ *     24      2     uint16 checksum: sum of bytes 2..23, modulo 65536
  */
 #include <Arduino.h>
 
@@ -40,6 +52,13 @@ const unsigned long TIMEOUT_US = 12000UL;
 // A value of -1 indicates a failed reading (error).
 int16_t distances_mm[NUM_SENSORS];
 
+// Binary streaming state (see protocol above).
+const uint8_t SYNC_0      = 0xA5;
+const uint8_t SYNC_1      = 0x5A;
+const uint8_t PACKET_SIZE = 2 + 2 + 4 + 2 * NUM_SENSORS + 2;
+bool     streaming = false;
+uint16_t sequence  = 0;
+
 
 //==============================================================================
 // SETUP FUNCTION
@@ -96,6 +115,43 @@ int16_t measureSensor(uint8_t idx) {
 }
 
 
+//==============================================================================
+// BINARY PACKET
+//==============================================================================
+
+/**
+ * @brief Sends the latest sweep as one fixed-size binary packet.
+ * @param sweep_ms millis() at the end of the sweep.
+ */
+void sendPacket(uint32_t sweep_ms) {
+  uint8_t buf[PACKET_SIZE];
+  uint8_t n = 0;
+
+  buf[n++] = SYNC_0;
+  buf[n++] = SYNC_1;
+  buf[n++] = sequence & 0xFF;
+  buf[n++] = sequence >> 8;
+  for (uint8_t b = 0; b < 4; b++) {
+    buf[n++] = (sweep_ms >> (8 * b)) & 0xFF;
+  }
+  for (uint8_t i = 0; i < NUM_SENSORS; i++) {
+    buf[n++] = distances_mm[i] & 0xFF;
+    buf[n++] = (distances_mm[i] >> 8) & 0xFF;
+  }
+
+  // Additive checksum over everything between the sync bytes and itself.
+  uint16_t sum = 0;
+  for (uint8_t i = 2; i < n; i++) {
+    sum += buf[i];
+  }
+  buf[n++] = sum & 0xFF;
+  buf[n++] = sum >> 8;
+
+  Serial.write(buf, n);
+  sequence++;
+}
+
+
 //==============================================================================
 // MAIN LOOP
 //==============================================================================
@@ -110,10 +166,24 @@ void loop() {
     // delay(5);
   }
 
+  // In streaming mode, push the sweep right away.
+  if (streaming) {
+    sendPacket(millis());
+  }
+
   // Check if the host has sent any data over USB.
   if (Serial.available()) {
+    char cmd = Serial.read();
+
+    // 'B' / 'A' switch between binary streaming and ASCII request mode.
+    if (cmd == 'B') {
+      streaming = true;
+    } else if (cmd == 'A') {
+      streaming = false;
+    }
+
     // If the received character is 'R', send back the distance data.
-    if (Serial.read() == 'R') {
+    if (cmd == 'R') {
       for (uint8_t i = 0; i < NUM_SENSORS; i++) {
         // Add a semicolon separator before each value except the first one.
         if (i > 0) {
@@ -0,0 +1,85 @@
+# associate.py
+
+from collections import deque
+import numpy as np
+from backend import iou_matrix
+
+class TargetLock:
+    """
+    Keeps the detector locked on one fish across frames. All boxes of a
+    frame are scored against the locked target's predicted box in one
+    NumPy pass:
+
+        cost = iou_weight·(1 − IoU) + dist_weight·min(d / diag, 1)
+
+    d being the centroid distance and diag the target box diagonal. The
+    cheapest box under max_cost keeps the lock; with none, the target is
+    reported missing for up to max_missed detector frames before the lock
+    is released and the best-scoring box starts a new track (new id).
+    """
+
+    def __init__(self, iou_weight: float = 0.5, dist_weight: float = 0.5,
+                 max_cost: float = 0.75, max_missed: int = 5, history: int = 30):
+        self.iou_weight  = iou_weight
+        self.dist_weight = dist_weight
+        self.max_cost    = max_cost
+        self.max_missed  = max_missed
+        self.history     = deque(maxlen=history)   # (timestamp, (cx, cy), xyxy)
+        self.track_id    = None
+        self.missed      = 0
+        self._next_id    = 1
+
+    def reset(self):
+        self.history.clear()
+        self.track_id = None
+        self.missed   = 0
+
+    def predicted(self, now: float) -> np.ndarray:
+        """Locked box (xyxy) moved by the constant-velocity history estimate."""
+        t1, (x1, y1), box = self.history[-1]
+        if len(self.history) < 2:
+            return box
+        t0, (x0, y0), _ = self.history[-2]
+        dt = t1 - t0
+        if dt <= 0:
+            return box
+        k = (now - t1) / dt
+        return box + np.array([x1 - x0, y1 - y0] * 2, np.float32) * k
+
+    def record(self, box, now: float):
+        """Append a tracked box (xyxy) to the history, e.g. from optical flow."""
+        box = np.asarray(box, np.float32)
+        self.history.append((now, ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2), box))
+
+    def update(self, boxes: np.ndarray, scores: np.ndarray, now: float):
+        """
+        Associate one frame of detector boxes (xyxy, best first) with the
+        target; returns the index of the target's box, or None if missing.
+        """
+        if self.track_id is not None:
+            if len(boxes):
+                pred  = self.predicted(now)
+                ious  = iou_matrix(pred[None], boxes)[0]
+                diag  = max(float(np.hypot(*(pred[2:] - pred[:2]))), 1.0)
+                d     = np.hypot((boxes[:, 0] + boxes[:, 2] - pred[0] - pred[2]) / 2,
+                                 (boxes[:, 1] + boxes[:, 3] - pred[1] - pred[3]) / 2)
+                cost  = (self.iou_weight  * (1.0 - ious)
+                         + self.dist_weight * np.minimum(d / diag, 1.0))
+                i     = int(cost.argmin())
+                if cost[i] <= self.max_cost:
+                    self.missed = 0
+                    self.record(boxes[i], now)
+                    return i
+            self.missed += 1
+            if self.missed <= self.max_missed:
+                return None
+            self.reset()
+
+        # no lock: acquire the best-scoring box as a new track
+        if not len(boxes):
+            return None
+        i = int(scores.argmax())
+        self.track_id  = self._next_id
+        self._next_id += 1
+        self.record(boxes[i], now)
+        return i
@@ -0,0 +1,228 @@
+# backend.py
+
+import shutil
+import logging
+import cv2
+import numpy as np
+from pathlib import Path
+from cache   import cached_path
+
+def _register_safe_globals():
+    """
+    Allow-list the ultralytics/torch classes in a .pt checkpoint so that
+    torch.load(weights_only=True) accepts it. Imported here, not at module
+    level, so the ONNX backends never pay for torch.
+    """
+    from torch.serialization import add_safe_globals
+    from torch.nn import (
+        Sequential, ModuleList, ModuleDict,
+        Conv2d, BatchNorm2d, SiLU,
+        MaxPool2d, Upsample, AdaptiveAvgPool2d,
+        Sigmoid, Hardswish, Dropout
+    )
+    from ultralytics.nn.tasks import DetectionModel
+    from ultralytics.nn.modules.conv import Conv, Concat
+    from ultralytics.nn.modules.block import C2f, Bottleneck, SPPF, DFL
+    from ultralytics.nn.modules.head import Detect
+
+    add_safe_globals([
+        DetectionModel, Sequential, ModuleList, ModuleDict,
+        Conv, C2f, Bottleneck, SPPF,
+        Conv2d, BatchNorm2d, SiLU,
+        MaxPool2d, Upsample, AdaptiveAvgPool2d,
+        Sigmoid, Hardswish, Dropout, Concat, Detect,
+        DFL
+    ])
+
+class UltralyticsBackend:
+    """
+    Full ultralytics/PyTorch YOLO model on a .pt checkpoint.
+    infer() returns (boxes Nx4 xyxy px, scores N, classes N), best first.
+    """
+
+    def __init__(self, model_path, conf: float, iou: float, imgsz: int):
+        from ultralytics import YOLO
+        _register_safe_globals()
+        self.model = YOLO(str(model_path))
+        self.conf  = conf
+        self.iou   = iou
+        self.imgsz = imgsz
+
+    def infer(self, frame: np.ndarray, imgsz: int = None):
+        r = self.model(frame, conf=self.conf, iou=self.iou, imgsz=imgsz or self.imgsz,
+                       verbose=False)[0]
+        b = r.boxes
+        return (b.xyxy.cpu().numpy(), b.conf.cpu().numpy(),
+                b.cls.cpu().numpy().astype(np.int64))
+
+class OnnxBackend:
+    """
+    Exported YOLOv8 ONNX model on onnxruntime (CPU) with NumPy pre/post:
+    letterbox into a preallocated canvas, one-pass HWC-BGR → NCHW-RGB
+    float into a preallocated input tensor, vectorized decode + NMS.
+    infer() returns (boxes Nx4 xyxy px, scores N, classes N), best first.
+    Models exported with dynamic axes also accept a per-call imgsz.
+    """
+
+    PAD_VALUE = 114
+
+    def __init__(self, model_path, conf: float, iou: float, imgsz: int, threads: int = 0,
+                 cache_dir=None):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+
+        # graph optimization is redone on every session; keep the optimized
+        # graph on disk (keyed by the model's hash) and load that next time;
+        # it may hold CPU-specific kernels, so the cache stays on the device
+        session_path = model_path
+        if cache_dir:
+            optimized = cached_path(cache_dir, model_path, ".ort.onnx")
+            if optimized.exists():
+                session_path = optimized
+                opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+                logging.info(f"Using cached optimized graph {optimized}")
+            else:
+                opts.optimized_model_filepath = str(optimized)
+        self.session = ort.InferenceSession(str(session_path), opts,
+                                            providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.conf = conf
+        self.iou  = iou
+
+        # static models fix the input size; dynamic ones use imgsz
+        h, w = inp.shape[2:4]
+        self.dynamic = not (isinstance(h, int) and isinstance(w, int))
+        self.size    = (h if isinstance(h, int) else imgsz,
+                        w if isinstance(w, int) else imgsz)
+        self._buffers = {}   # input size → [canvas, input tensor, frame geometry]
+        logging.info(f"ONNX model {model_path} input {inp.shape} → {self.size}")
+
+    def _letterbox(self, frame: np.ndarray, size):
+        """Resize-and-pad frame into the input tensor; returns (input, scale, (pad_x, pad_y))."""
+        buf = self._buffers.get(size)
+        if buf is None:
+            buf = self._buffers[size] = [np.full((*size, 3), self.PAD_VALUE, np.uint8),
+                                         np.empty((1, 3, *size), np.float32), None]
+        canvas, tensor, geometry = buf
+
+        H, W  = size
+        h, w  = frame.shape[:2]
+        scale = min(H / h, W / w)
+        nh, nw = round(h * scale), round(w * scale)
+        top, left = (H - nh) // 2, (W - nw) // 2
+
+        # padding only needs repainting when the frame geometry changes
+        if geometry != (h, w):
+            canvas.fill(self.PAD_VALUE)
+            buf[2] = (h, w)
+        canvas[top:top+nh, left:left+nw] = cv2.resize(
+            frame[..., :3], (nw, nh), interpolation=cv2.INTER_LINEAR
+        )
+
+        # BGR HWC uint8 → RGB CHW float32 [0,1] in one ufunc pass
+        np.multiply(canvas[..., ::-1].transpose(2, 0, 1), 1 / 255.0,
+                    out=tensor[0], casting="unsafe")
+        return tensor, scale, (left, top)
+
+    def _size(self, imgsz: int = None):
+        """Input size for a call: imgsz (stride-32 multiple) on dynamic models."""
+        if imgsz is None or not self.dynamic:
+            return self.size
+        imgsz = max(32, int(round(imgsz / 32)) * 32)
+        return (imgsz, imgsz)
+
+    def prepare(self, frame: np.ndarray, imgsz: int = None):
+        """Preprocess frame; returns (input_tensor, scale, pad). The tensor is reused."""
+        return self._letterbox(frame, self._size(imgsz))
+
+    def infer(self, frame: np.ndarray, imgsz: int = None):
+        tensor, scale, pad = self._letterbox(frame, self._size(imgsz))
+        pred = self.session.run(None, {self.input_name: tensor})[0]
+        return decode(pred[0], scale, pad, frame.shape, self.conf, self.iou)
+
+def decode(pred: np.ndarray, scale: float, pad, shape, conf: float, iou: float):
+    """
+    YOLOv8 head output (4+nc, N) → (boxes xyxy, scores, classes) in frame
+    pixels, filtered by confidence and class-aware NMS, best first.
+    """
+    pred    = pred.T
+    cls_all = pred[:, 4:]
+    classes = cls_all.argmax(axis=1)
+    scores  = cls_all[np.arange(len(cls_all)), classes]
+    keep    = scores >= conf
+    if not keep.any():
+        return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int64)
+    xywh, scores, classes = pred[keep, :4], scores[keep], classes[keep]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= scale
+    h, w = shape[:2]
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+
+    # class-aware NMS: offset boxes per class so classes never overlap
+    idx = nms(boxes + classes[:, None] * float(max(h, w) + 1), scores, iou)
+    return boxes[idx], scores[idx], classes[idx]
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of xyxy boxes a (N,4) and b (M,4) → (N,M)."""
+    lt    = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb    = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thr: float) -> np.ndarray:
+    """Greedy NMS; returns kept indices sorted by descending score."""
+    order = scores.argsort()[::-1]
+    keep  = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        ious  = iou_matrix(boxes[i:i+1], boxes[order[1:]])[0]
+        order = order[1:][ious <= iou_thr]
+    return np.array(keep, np.int64)
+
+def export_onnx(weights, cache_dir) -> Path:
+    """
+    Fused, dynamic-axes ONNX export of .pt weights, cached by the weights'
+    hash so the (slow) ultralytics export only runs once per checkpoint.
+    """
+    out = cached_path(cache_dir, weights, ".onnx")
+    if out.exists():
+        logging.info(f"Using cached ONNX export {out}")
+        return out
+    from ultralytics import YOLO
+    _register_safe_globals()
+    logging.info(f"Exporting {weights} to ONNX (first boot with these weights)...")
+    exported = YOLO(str(weights)).export(format="onnx", dynamic=True)
+    shutil.move(str(exported), out)
+    return out
+
+def make_backend(kind: str, model_path, conf: float, iou: float, imgsz: int, threads: int = 0,
+                 cache_dir=None, prepare: bool = False):
+    """
+    Build the backend selected by detector.backend in config.yaml. With
+    `prepare`, .pt weights are exported once to a cached ONNX model and run
+    on onnxruntime instead of PyTorch.
+    """
+    if kind == "ultralytics":
+        if not (prepare and cache_dir):
+            return UltralyticsBackend(model_path, conf, iou, imgsz)
+        model_path = export_onnx(model_path, cache_dir)
+        kind = "onnx"
+    if kind in ("onnx", "onnx_int8"):
+        return OnnxBackend(model_path, conf, iou, imgsz, threads, cache_dir)
+    raise ValueError(f"Unknown detector backend '{kind}' "
+                     f"(expected 'ultralytics', 'onnx' or 'onnx_int8')")
@@ -0,0 +1,22 @@
+# cache.py
+
+import hashlib
+from pathlib import Path
+
+def file_hash(path, length: int = 16) -> str:
+    """Truncated SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:length]
+
+def cached_path(cache_dir, source, suffix: str) -> Path:
+    """
+    Where the artifact prepared from `source` lives: <cache_dir>/<stem>-<hash><suffix>.
+    New weights hash differently, so stale artifacts are never picked up.
+    """
+    source    = Path(source)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / f"{source.stem}-{file_hash(source)}{suffix}"
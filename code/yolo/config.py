@@ -63,6 +63,8 @@ PWM_PINS          = tuple(_data["motor"]["pwm_pins"])
 SENSOR_FRONT_PINS    = tuple(_data["sensor"]["front_pins"])
 SENSOR_REAR_PINS     = tuple(_data["sensor"]["rear_pins"])
 SENSOR_TIMEOUT_S     = float(_data["sensor"]["timeout_s"])
+SENSOR_CYCLE_S       = float(_data["sensor"]["cycle_s"])
+SENSOR_MAX_AGE       = float(_data["sensor"]["max_age_s"])
 SENSOR_POLL_INTERVAL = float(_data["sensor"]["poll_interval_s"])
 
 # Tracker (HSV)
@@ -70,6 +72,40 @@ HSV_LOWER    = tuple(_data["tracker"]["hsv_lower"])
 HSV_UPPER    = tuple(_data["tracker"]["hsv_upper"])
 KERNEL_SIZE  = tuple(_data["tracker"]["kernel_size"])
 
+# Detector
+_HERE               = Path(__file__).resolve().parent
+DETECTOR_BACKEND    = _data["detector"]["backend"]
+DETECTOR_MODEL_PATH = _HERE / _data["detector"]["model_path"]
+DETECTOR_ONNX_PATH  = _HERE / _data["detector"]["onnx_path"]
+DETECTOR_INT8_PATH  = _HERE / _data["detector"]["int8_path"]
+DETECTOR_IMGSZ      = int(_data["detector"]["imgsz"])
+DETECTOR_CONF       = float(_data["detector"]["conf"])
+DETECTOR_IOU        = float(_data["detector"]["iou"])
+DETECTOR_THREADS    = int(_data["detector"]["threads"])
+DETECTOR_WARMUP     = int(_data["detector"]["warmup_runs"])
+DETECTOR_CACHE_DIR  = (_HERE / _data["detector"]["cache_dir"]) if _data["detector"]["cache_dir"] else None
+DETECTOR_PREPARE    = bool(_data["detector"]["prepare"])
+
+# Detector hybrid mode (detect every N frames, optical flow in between)
+HYBRID_ENABLED      = bool(_data["detector"]["hybrid"]["enabled"])
+HYBRID_DETECT_EVERY = int(_data["detector"]["hybrid"]["detect_every"])
+HYBRID_MIN_QUALITY  = float(_data["detector"]["hybrid"]["min_quality"])
+HYBRID_MIN_POINTS   = int(_data["detector"]["hybrid"]["min_points"])
+HYBRID_FB_MAX_PX    = float(_data["detector"]["hybrid"]["fb_max_px"])
+
+# Detector crop mode (small-input pass around the last detection)
+CROP_ENABLED        = bool(_data["detector"]["crop"]["enabled"])
+CROP_IMGSZ          = int(_data["detector"]["crop"]["imgsz"])
+CROP_PAD            = float(_data["detector"]["crop"]["pad"])
+CROP_MIN_SIZE       = int(_data["detector"]["crop"]["min_size"])
+
+# Target lock (box association across frames)
+LOCK_IOU_WEIGHT     = float(_data["detector"]["lock"]["iou_weight"])
+LOCK_DIST_WEIGHT    = float(_data["detector"]["lock"]["dist_weight"])
+LOCK_MAX_COST       = float(_data["detector"]["lock"]["max_cost"])
+LOCK_MAX_MISSED     = int(_data["detector"]["lock"]["max_missed"])
+LOCK_HISTORY        = int(_data["detector"]["lock"]["history"])
+
 # Draw styles
 BOX_COLOR       = (0, 255, 0) 
 GRID_COLOR      = tuple(_data["draw"]["grid_color"])
@@ -86,3 +122,29 @@ PROXIMITY_LIMIT      = float(_data["control"]["proximity_limit_cm"])
 CAMERA_FORMAT    = _data["camera"]["format"]
 CAMERA_RESOLUTION = tuple(_data["camera"]["resolution"])
 CAMERA_FRAMERATE  = float(_data["camera"]["framerate"])
+
+# Frame source
+SOURCE_KIND       = _data["source"]["kind"]
+SOURCE_PATH       = _HERE / _data["source"]["path"]
+SOURCE_REALTIME   = bool(_data["source"]["realtime"])
+SOURCE_LOOP       = bool(_data["source"]["loop"])
+SIMULATE_HARDWARE = bool(_data["source"]["simulate_hardware"])
+
+# Display / preview
+DISPLAY_HEADLESS  = bool(_data["display"]["headless"])
+PREVIEW_ENABLED   = bool(_data["display"]["preview"]["enabled"])
+PREVIEW_PORT      = int(_data["display"]["preview"]["port"])
+PREVIEW_EVERY_N   = int(_data["display"]["preview"]["every_n"])
+PREVIEW_MAX_FPS   = float(_data["display"]["preview"]["max_fps"])
+PREVIEW_QUALITY   = int(_data["display"]["preview"]["quality"])
+
+# Recording
+RECORD_ENABLED    = bool(_data["record"]["enabled"])
+RECORD_DIR        = _HERE / _data["record"]["dir"]
+RECORD_FOURCC     = _data["record"]["fourcc"]
+RECORD_FPS        = float(_data["record"]["fps"])
+RECORD_SEGMENT_S  = float(_data["record"]["segment_s"])
+RECORD_QUEUE_SIZE = int(_data["record"]["queue_size"])
+
+# Runtime
+RUNTIME_PIPELINED = bool(_data["runtime"]["pipelined"])
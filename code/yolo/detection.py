@@ -0,0 +1,43 @@
+# detection.py
+
+def grid_cell(x: float, y: float, w: int, h: int):
+    """(row, col) of point (x, y) in the 3×3 grid of a w×h frame (image space)."""
+    return (max(0, min(2, int(y / (h/3)))),
+            max(0, min(2, int(x / (w/3)))))
+
+class Detection:
+    """
+    Per-frame fish detection, computed once by Yolov8n and shared by
+    Control and Draw: centroid (x, y), bbox (x, y, w, h), area (px),
+    confidence, grid cell (row, col) in image space, capture timestamp (s),
+    the detector class id and the locked target's track id.
+    """
+    __slots__ = ("centroid", "bbox", "area", "confidence", "cell", "timestamp", "class_id",
+                 "track_id")
+
+    def __init__(self, centroid, bbox, area, confidence, cell, timestamp, class_id=0,
+                 track_id=None):
+        self.centroid   = centroid
+        self.bbox       = bbox
+        self.area       = area
+        self.confidence = confidence
+        self.cell       = cell
+        self.timestamp  = timestamp
+        self.class_id   = class_id
+        self.track_id   = track_id
+
+    @classmethod
+    def from_xyxy(cls, x1, y1, x2, y2, confidence, class_id, frame_shape, timestamp,
+                  track_id=None):
+        """Build from a corner box in pixels of a frame of shape (h, w, ...)."""
+        h, w   = frame_shape[:2]
+        x1, y1 = int(x1), int(y1)
+        x2, y2 = int(x2), int(y2)
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        bw, bh = x2 - x1, y2 - y1
+        return cls((cx, cy), (x1, y1, bw, bh), float(bw * bh), float(confidence),
+                   grid_cell(cx, cy, w, h), timestamp, int(class_id), track_id)
+
+    def __repr__(self):
+        return (f"Detection(centroid={self.centroid}, bbox={self.bbox}, area={self.area:.0f}, "
+                f"confidence={self.confidence:.2f}, cell={self.cell}, track_id={self.track_id})")
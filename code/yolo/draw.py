@@ -7,6 +7,7 @@ from config import (
     FONT_SCALE, THICKNESS, QUADRANT_LABELS,
     CAMERA_RESOLUTION
 )
+from detection import Detection
 
 class Draw:
     def __init__(self):
@@ -19,51 +20,62 @@ class Draw:
         self.thk        = THICKNESS
         self.labels     = QUADRANT_LABELS
 
-        # Precompute grid lines for resolution
+        # Static overlay (grid + labels), built once per frame size
         w, h = CAMERA_RESOLUTION
         self.w = w
         self.h = h
-        self._grid_lines = []
-        for i in (1, 2):
-            # horizontal
-            y = i * h // 3
-            self._grid_lines.append(((0, y), (w, y)))
-            # vertical
-            x = i * w // 3
-            self._grid_lines.append(((x, 0), (x, h)))
-
-        # Precompute label positions and text sizes
-        self._labels = []
-        for i, row in enumerate(self.labels):
-            for j, text in enumerate(row):
-                cx = int((j + 0.5) * w / 3)
-                cy = int((i + 0.5) * h / 3)
-                (tw, th), _ = cv2.getTextSize(text, self.font, self.scale, self.thk)
-                org = (cx - tw//2, cy + th//2)
-                self._labels.append((text, org))
+        self._build_static(w, h)
 
         # Fixed origin for fish‐coordinates display
         self._coord_origin = (10, 30)
 
-    def render(self, frame: np.ndarray, center: tuple, bbox: tuple, fps: float):
-        output = frame.copy()
+        # FPS text is left-aligned at the widest value's origin, so its
+        # size is measured once instead of every frame
+        (tw, _), _ = cv2.getTextSize("FPS: 000.0", self.font, self.scale, self.thk)
+        self._fps_dx = tw + 10
+
+    def _build_static(self, w: int, h: int):
+        """
+        Draw the grid lines and quadrant labels once into a BGR layer plus
+        a mask of their pixels; render() composites it with one masked copy.
+        """
+        self._overlay      = np.zeros((h, w, 3), np.uint8)
+        self._overlay_mask = np.zeros((h, w), np.uint8)
+        for layer, grid, text in ((self._overlay, self.grid_color, self.text_color),
+                                  (self._overlay_mask, 255, 255)):
+            for i in (1, 2):
+                cv2.line(layer, (0, i * h // 3), (w, i * h // 3), grid, 2)   # horizontal
+                cv2.line(layer, (i * w // 3, 0), (i * w // 3, h), grid, 2)   # vertical
+            for i, row in enumerate(self.labels):
+                for j, label in enumerate(row):
+                    cx = int((j + 0.5) * w / 3)
+                    cy = int((i + 0.5) * h / 3)
+                    (tw, th), _ = cv2.getTextSize(label, self.font, self.scale, self.thk)
+                    cv2.putText(layer, label, (cx - tw//2, cy + th//2), self.font, self.scale,
+                                text, self.thk, cv2.LINE_AA)
+        # anti-aliased edges: keep the pixels that are mostly text
+        self._overlay_mask[self._overlay_mask < 128] = 0
 
-        # 1) Draw grid
-        for pt1, pt2 in self._grid_lines:
-            cv2.line(output, pt1, pt2, self.grid_color, 2)
+    def render(self, frame: np.ndarray, det: Detection, fps: float):
+        """Draw the overlays onto frame in place and return it."""
+        output = frame
+        h, w = frame.shape[:2]
+        if self._overlay.shape[:2] != (h, w):
+            self._build_static(w, h)
 
-        # 2) Draw quadrant labels
-        for text, org in self._labels:
-            cv2.putText(output, text, org, self.font, self.scale, self.text_color, self.thk, cv2.LINE_AA)
+        # 1-2) Composite the cached grid + quadrant labels
+        cv2.copyTo(self._overlay, self._overlay_mask, output)
 
         # 3) Draw bounding box if exists
-        if bbox is not None:
-            x1, y1, x2, y2 = bbox
-            cv2.rectangle(output, (x1, y1), (x2, y2), self.box_color, 2)
+        if det is not None:
+            bx, by, bw, bh = det.bbox
+            cv2.rectangle(output, (bx, by), (bx + bw, by + bh), self.box_color, 2)
+            if det.track_id is not None:
+                cv2.putText(output, f"ID {det.track_id}", (bx, max(by - 8, 15)), self.font,
+                            self.scale, self.box_color, self.thk, cv2.LINE_AA)
 
-        # 4) Draw center point if exists
-        if center is not None:
-            x, y = center
+            # 4) Draw center point
+            x, y = det.centroid
             cv2.circle(output, (x, y), 6, (0, 0, 255), -1)  # Red dot at center
 
             # Draw fish coordinates
@@ -80,9 +92,7 @@ class Draw:
             )
 
         # 5) Draw FPS (bottom‐right)
-        fps_text = f"FPS: {fps:.1f}"
-        (tw, th), _ = cv2.getTextSize(fps_text, self.font, self.scale, self.thk)
-        org = (self.w - tw - 10, self.h - 10)
-        cv2.putText(output, fps_text, org, self.font, self.scale, self.fps_color, self.thk, cv2.LINE_AA)
+        cv2.putText(output, f"FPS: {fps:.1f}", (w - self._fps_dx, h - 10), self.font, self.scale,
+                    self.fps_color, self.thk, cv2.LINE_AA)
 
         return output
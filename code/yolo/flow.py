@@ -0,0 +1,91 @@
+# flow.py
+
+import cv2
+import numpy as np
+
+class FlowTracker:
+    """
+    Median-flow box tracker used between detector runs: corners inside the
+    last box are followed with pyramidal Lucas-Kanade, kept only if the
+    backward flow lands within fb_max_px of where they started, and the box
+    is shifted by their median motion and scaled by the median change of
+    their pairwise distances. update() returns (bbox, quality), quality
+    being the fraction of the seeded corners still tracked (0 = lost).
+    """
+
+    def __init__(self, max_corners: int = 30, min_points: int = 6,
+                 fb_max_px: float = 1.0, win: int = 21, levels: int = 3):
+        self.max_corners = max_corners
+        self.min_points  = min_points
+        self.fb_max      = fb_max_px
+        self.lk = dict(winSize=(win, win), maxLevel=levels,
+                       criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.prev_gray = None
+        self.points    = None
+        self.bbox      = None
+        self.seeded    = 0
+
+    def reset(self):
+        self.prev_gray = None
+        self.points    = None
+        self.bbox      = None
+
+    def init(self, gray: np.ndarray, bbox) -> bool:
+        """Seed corners inside bbox (x, y, w, h); False if too few were found."""
+        self.reset()
+        x, y, w, h = bbox
+        H, W = gray.shape[:2]
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x + w), W), min(int(y + h), H)
+        if x1 - x0 < 4 or y1 - y0 < 4:
+            return False
+
+        mask = np.zeros_like(gray)
+        mask[y0:y1, x0:x1] = 255
+        pts = cv2.goodFeaturesToTrack(gray, self.max_corners, 0.01, 3, mask=mask)
+        if pts is None or len(pts) < self.min_points:
+            return False
+        self.prev_gray = gray
+        self.points    = pts.astype(np.float32)
+        self.seeded    = len(pts)
+        self.bbox      = (float(x), float(y), float(w), float(h))
+        return True
+
+    def update(self, gray: np.ndarray):
+        """Propagate the box into `gray`; returns (bbox, quality) or (None, 0.0)."""
+        if self.points is None:
+            return None, 0.0
+
+        # 1) forward + backward flow, keep consistent points
+        fwd, st1, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.points, None, **self.lk)
+        bwd, st2, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, fwd, None, **self.lk)
+        fb   = np.linalg.norm((self.points - bwd).reshape(-1, 2), axis=1)
+        good = (st1.ravel() == 1) & (st2.ravel() == 1) & (fb <= self.fb_max)
+        if good.sum() < self.min_points:
+            self.reset()
+            return None, 0.0
+        p0 = self.points.reshape(-1, 2)[good]
+        p1 = fwd.reshape(-1, 2)[good]
+
+        # 2) median translation and scale
+        dx, dy = np.median(p1 - p0, axis=0)
+        i, j   = np.triu_indices(len(p0), 1)
+        d0     = np.linalg.norm(p0[i] - p0[j], axis=1)
+        d1     = np.linalg.norm(p1[i] - p1[j], axis=1)
+        valid  = d0 > 1e-3
+        s      = float(np.median(d1[valid] / d0[valid])) if valid.any() else 1.0
+
+        x, y, w, h = self.bbox
+        cx, cy     = x + w / 2 + dx, y + h / 2 + dy
+        w, h       = w * s, h * s
+        self.bbox  = (cx - w / 2, cy - h / 2, w, h)
+
+        # 3) box left the frame → lost
+        H, W = gray.shape[:2]
+        if not (0 <= cx < W and 0 <= cy < H):
+            self.reset()
+            return None, 0.0
+
+        self.prev_gray = gray
+        self.points    = p1.reshape(-1, 1, 2)
+        return self.bbox, len(p1) / self.seeded
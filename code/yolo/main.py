@@ -1,92 +1,149 @@
+import time
+_T0 = time.perf_counter()
+
 import logging
 import cv2
+
+from config    import (setup_logging, CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE,
+                       RUNTIME_PIPELINED, SOURCE_KIND, SOURCE_PATH, SOURCE_REALTIME,
+                       SOURCE_LOOP, SIMULATE_HARDWARE, DISPLAY_HEADLESS, PREVIEW_ENABLED,
+                       PREVIEW_PORT, PREVIEW_EVERY_N, PREVIEW_MAX_FPS, PREVIEW_QUALITY,
+                       RECORD_ENABLED, RECORD_DIR, RECORD_FOURCC, RECORD_FPS,
+                       RECORD_SEGMENT_S, RECORD_QUEUE_SIZE, SENSOR_FRONT_PINS,
+                       SENSOR_REAR_PINS)
+if SIMULATE_HARDWARE:
+    # off the robot: fake RPi.GPIO (obstacles 100 cm away) before anything
+    # imports the real one
+    import fake_gpio
+    fake_gpio.install()
+    fake_gpio.hcsr04(*SENSOR_FRONT_PINS)
+    fake_gpio.hcsr04(*SENSOR_REAR_PINS)
 import RPi.GPIO as GPIO
-import torch
-from ultralytics.nn.tasks import DetectionModel
-from ultralytics.nn.modules.conv import Conv
-from ultralytics.nn.modules.block import C2f, Bottleneck, SPPF
-from ultralytics.nn.modules.conv import Concat
-from ultralytics.nn.modules.head import Detect
-from ultralytics.nn.modules.block import DFL
-from torch.nn import (
-    Sequential, ModuleList, ModuleDict,
-    Conv2d, BatchNorm2d, SiLU,
-    MaxPool2d, Upsample, AdaptiveAvgPool2d,
-    Sigmoid, Hardswish, Dropout
-)
-from torch.serialization import add_safe_globals
-
-add_safe_globals([
-    DetectionModel, Sequential, ModuleList, ModuleDict,
-    Conv, C2f, Bottleneck, SPPF,
-    Conv2d, BatchNorm2d, SiLU,
-    MaxPool2d, Upsample, AdaptiveAvgPool2d,
-    Sigmoid, Hardswish, Dropout, Concat, Detect,
-    DFL
-])
-
-from picamera2 import Picamera2
-
-from config    import setup_logging, CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE
-from yolov8n     import Yolov8n
+from source    import make_source
+from preview   import MjpegPreview
+from recorder  import Recorder
+from pipeline  import Pipeline, Packet
+from startup   import StartupTimer
+from yolov8n   import Yolov8n
 from draw      import Draw
 from control   import Control
 from direction import Direction
 
+_T_IMPORTS = time.perf_counter() - _T0
+
 class Main:
     def __init__(self):
         setup_logging()
         logging.info("Initialization successful.")
 
-        self.yolov8n    = Yolov8n()
-        self.control = Control(self.yolov8n)
-        self.drawer     = Draw()
-
-        # Configure & start camera entirely from config
-        self.camera = Picamera2()
-        self.camera.configure(
-            self.camera.create_preview_configuration(
-                main     = {"format": CAMERA_FORMAT, "size": CAMERA_RESOLUTION},
-                controls = {"FrameRate": CAMERA_FRAMERATE}
-            )
-        )
-        self.camera.start()
-        logging.info("Camera started")
+        # heavy frameworks (torch/ultralytics, onnxruntime) load inside the
+        # selected detector backend, so each phase is timed separately
+        self.startup = StartupTimer(_T0)
+        self.startup.add("imports", _T_IMPORTS)
+
+        with self.startup.phase("detector"):
+            self.yolov8n = Yolov8n()
+        with self.startup.phase("detector warm-up"):
+            self.yolov8n.warmup()
+        with self.startup.phase("control + sensors"):
+            self.control = Control(self.yolov8n)
+        with self.startup.phase("draw"):
+            self.drawer  = Draw()
+            self.preview = None
+            if PREVIEW_ENABLED:
+                self.preview = MjpegPreview(self._render_copy, PREVIEW_PORT, PREVIEW_EVERY_N,
+                                            PREVIEW_MAX_FPS, PREVIEW_QUALITY)
+            self.recorder = None
+            if RECORD_ENABLED:
+                self.recorder = Recorder(RECORD_DIR, RECORD_FPS, RECORD_FOURCC,
+                                         RECORD_SEGMENT_S, RECORD_QUEUE_SIZE)
+
+        # Configure & start the frame source (camera or replay) from config
+        with self.startup.phase("camera"):
+            self.camera = make_source(SOURCE_KIND, SOURCE_PATH, SOURCE_REALTIME, SOURCE_LOOP,
+                                      CAMERA_FORMAT, CAMERA_RESOLUTION, CAMERA_FRAMERATE)
+            self.camera.start()
+
+    # --- stages (shared by the serial loop and the pipelined runtime) ---
+    def _capture(self):
+        frame = self.camera.read()
+        if frame is None:
+            return None
+        if not self.startup.reported and not self.startup.milestones:
+            self.startup.mark("first frame")
+        return frame
+
+    def _detect(self, pkt: Packet):
+        # 1) FPS tracking moved into Track
+        pkt.fps, _ = self.yolov8n.track_fps()
+
+        # 2) Detection
+        pkt.det = self.yolov8n.track_frame(pkt.frame, timestamp=pkt.t_capture)
+
+    def _act(self, pkt: Packet):
+        # 3) Movement
+        self.control.move(pkt.frame, pkt.det)
+        if not self.startup.reported:
+            self.startup.mark("first control command")
+            self.startup.report()
+
+    def _render(self, pkt: Packet, frame=None):
+        return self.drawer.render(pkt.frame if frame is None else frame, pkt.det, pkt.fps)
+
+    def _render_copy(self, pkt: Packet):
+        # preview thread: draw on a copy, the recorder may still hold pkt.frame
+        return self._render(pkt, pkt.frame.copy())
+
+    def _show(self, pkt: Packet) -> bool:
+        # headless: no overlays or window, the preview renders off-thread
+        if DISPLAY_HEADLESS:
+            if self.recorder:
+                self.recorder.write(pkt.frame)
+            if self.preview:
+                self.preview.offer(pkt)
+            return True
+
+        # 4) Draw overlays (instantaneous FPS only)
+        out = self._render(pkt)
+        if self.recorder:
+            self.recorder.write(out)
+        if self.preview:
+            self.preview.offer(pkt, out)
+
+        # 5) Display
+        #cv2.imshow("BINARY", bin_mask)
+        cv2.imshow("MAIN",   out)
+        return cv2.waitKey(1) == -1
 
     def run(self):
-        while True:
-            frame = self.camera.capture_array()
-            
-            # Remove o canal alpha se existir
-            if frame.shape[2] == 4:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
-
-            # 1) FPS tracking moved into Track
-            inst_fps, _ = self.yolov8n.track_fps()
-
-            # 2) Detection + movement
-            result = self.yolov8n.track_frame(frame)
-
-            if result:
-                center = result['center']
-                bbox = result['bbox']
-            #contour, mask = self.yolov8n.track_frame(frame)
-            self.control.move(frame, center)
-
-            # 3) Draw overlays (instantaneous FPS only)
-            #out, bin_mask = self.drawer.render(frame, center, inst_fps)
-            out = self.drawer.render(frame, center, bbox, inst_fps)
-
-            # 4) Display
-            #cv2.imshow("BINARY", bin_mask)
-            cv2.imshow("MAIN",   out)
-            if cv2.waitKey(1) != -1:
-                break
-
-        self.camera.stop()
-        cv2.destroyAllWindows()
-        GPIO.cleanup()
+        try:
+            if RUNTIME_PIPELINED:
+                logging.info("Runtime: pipelined capture/detect/control threads")
+                Pipeline(self._capture, self._detect, self._act, self._show).run()
+            else:
+                seq = 0
+                while True:
+                    frame = self._capture()
+                    if frame is None:
+                        break
+                    seq += 1
+                    pkt = Packet(seq, frame, time.time())
+                    self._detect(pkt)
+                    self._act(pkt)
+                    if not self._show(pkt):
+                        break
+        except KeyboardInterrupt:
+            logging.info("Interrupted")
+        finally:
+            if self.preview:
+                self.preview.close()
+            if self.recorder:
+                self.recorder.close()
+            self.camera.stop()
+            if not DISPLAY_HEADLESS:
+                cv2.destroyAllWindows()
+            self.control.sensor.stop()
+            GPIO.cleanup()
 
 if __name__ == "__main__":
     Main().run()
@@ -0,0 +1,150 @@
+# pipeline.py
+
+import time
+import logging
+import threading
+
+class Packet:
+    """One captured frame travelling through the stages."""
+    __slots__ = ("seq", "frame", "t_capture", "det", "mask", "fps")
+
+    def __init__(self, seq: int, frame, t_capture: float):
+        self.seq       = seq
+        self.frame     = frame
+        self.t_capture = t_capture
+        self.det       = None
+        self.mask      = None
+        self.fps       = 0.0
+
+class Mailbox:
+    """
+    Single-slot "latest value" handoff between two threads. put() replaces
+    an untaken item (counted in `dropped`) instead of queueing it; get()
+    waits for an item and takes it.
+    """
+
+    def __init__(self, name: str):
+        self.name     = name
+        self.dropped  = 0
+        self._item    = None
+        self._closed  = False
+        self._cond    = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout: float = None):
+        """Newest item, or None on timeout / close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._item is not None or self._closed, timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+class Pipeline:
+    """
+    Capture → detect → act stages on their own threads, linked by
+    Mailboxes, with the display on the calling (main) thread since
+    cv2.imshow must stay there. Stale frames are dropped, never queued.
+
+      capture()    -> frame, None at end   (camera thread)
+      detect(pkt)  fills pkt.det/mask/fps  (detection thread)
+      act(pkt)     control / motors        (control thread)
+      show(pkt)    -> False to stop        (main thread)
+    """
+
+    def __init__(self, capture, detect, act, show, stats_interval_s: float = 10.0):
+        self._capture = capture
+        self._detect  = detect
+        self._act     = act
+        self._show    = show
+        self._stop    = threading.Event()
+
+        self.frames   = Mailbox("capture→detect")
+        self.results  = Mailbox("detect→control")
+        self.display  = Mailbox("control→display")
+
+        # stats
+        self.captured     = 0
+        self.acted        = 0
+        self._ages        = []
+        self._stats_every = stats_interval_s
+        self._last_stats  = time.time()
+
+    def _worker(self, name, fn):
+        def loop():
+            try:
+                while not self._stop.is_set():
+                    fn()
+            except Exception:
+                logging.exception(f"Pipeline stage '{name}' failed")
+                self.stop()
+        return threading.Thread(target=loop, name=name, daemon=True)
+
+    def _capture_step(self):
+        frame = self._capture()
+        if frame is None:
+            # end of a replayed source
+            self.stop()
+            return
+        self.captured += 1
+        self.frames.put(Packet(self.captured, frame, time.time()))
+
+    def _detect_step(self):
+        pkt = self.frames.get(timeout=0.5)
+        if pkt is not None:
+            self._detect(pkt)
+            self.results.put(pkt)
+
+    def _act_step(self):
+        pkt = self.results.get(timeout=0.5)
+        if pkt is None:
+            return
+        self._act(pkt)
+        self.acted += 1
+        self._ages.append(time.time() - pkt.t_capture)
+        self.display.put(pkt)
+        self._log_stats()
+
+    def _log_stats(self):
+        now = time.time()
+        if now - self._last_stats < self._stats_every or not self._ages:
+            return
+        ages = sorted(self._ages)
+        logging.info(
+            f"Pipeline: captured {self.captured}, acted {self.acted} | dropped "
+            + ", ".join(f"{m.name} {m.dropped}" for m in (self.frames, self.results, self.display))
+            + f" | frame age at control: median {1000*ages[len(ages)//2]:.0f} ms, "
+              f"max {1000*ages[-1]:.0f} ms"
+        )
+        self._ages.clear()
+        self._last_stats = now
+
+    def stop(self):
+        self._stop.set()
+        for m in (self.frames, self.results, self.display):
+            m.close()
+
+    def run(self):
+        threads = [self._worker("capture", self._capture_step),
+                   self._worker("detect",  self._detect_step),
+                   self._worker("control", self._act_step)]
+        for t in threads:
+            t.start()
+        try:
+            while not self._stop.is_set():
+                pkt = self.display.get(timeout=0.5)
+                if pkt is not None and self._show(pkt) is False:
+                    break
+        finally:
+            self.stop()
+            for t in threads:
+                t.join(timeout=2.0)
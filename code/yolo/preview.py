@@ -0,0 +1,118 @@
+# preview.py
+
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+from pipeline import Mailbox
+
+class MjpegPreview:
+    """
+    Live preview as an MJPEG stream on http://<robot>:<port>/ for headless
+    runs. offer() is all the control loop pays: every Nth frame (and at most
+    max_fps) is handed to a background thread that renders the overlays,
+    JPEG-encodes and pushes to the connected browsers. With no client
+    connected nothing is rendered or encoded.
+    """
+
+    BOUNDARY = b"frame"
+
+    def __init__(self, render, port: int = 8080, every_n: int = 3, max_fps: float = 10.0,
+                 quality: int = 70):
+        self.render    = render
+        self.every_n   = max(1, every_n)
+        self.period    = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.params    = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.clients   = 0
+        self.encoded   = 0
+        self._count    = 0
+        self._last     = 0.0
+        self._inbox    = Mailbox("preview")
+        self._jpeg     = None
+        self._jpeg_seq = 0
+        self._cond     = threading.Condition()
+        self._stop     = threading.Event()
+
+        preview = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/stream.mjpg"):
+                    self.send_error(404)
+                    return
+                preview._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="preview-http", daemon=True).start()
+        threading.Thread(target=self._encode_loop, name="preview-encode", daemon=True).start()
+        logging.info(f"MJPEG preview on http://0.0.0.0:{port}/ (every {self.every_n} frames, "
+                     f"≤ {max_fps:g} FPS)")
+
+    def offer(self, pkt, image=None):
+        """
+        Called once per frame from the loop: hand over the Packet (and the
+        already rendered image, if any) when a frame is due. Never blocks.
+        """
+        self._count += 1
+        if not self.clients or self._count % self.every_n:
+            return
+        now = time.perf_counter()
+        if now - self._last < self.period:
+            return
+        self._last = now
+        self._inbox.put((pkt, image))
+
+    def _encode_loop(self):
+        while not self._stop.is_set():
+            item = self._inbox.get(timeout=0.5)
+            if item is None:
+                continue
+            pkt, image = item
+            if image is None:
+                image = self.render(pkt)
+            ok, buf = cv2.imencode(".jpg", image, self.params)
+            if not ok:
+                continue
+            with self._cond:
+                self._jpeg      = buf.tobytes()
+                self._jpeg_seq += 1
+                self._cond.notify_all()
+            self.encoded += 1
+
+    def _serve(self, handler):
+        handler.send_response(200)
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Content-Type",
+                            "multipart/x-mixed-replace; boundary=" + self.BOUNDARY.decode())
+        handler.end_headers()
+        with self._cond:
+            self.clients += 1
+        seen = self._jpeg_seq
+        try:
+            while not self._stop.is_set():
+                with self._cond:
+                    self._cond.wait_for(lambda: self._jpeg_seq != seen or self._stop.is_set(), 1.0)
+                    if self._jpeg_seq == seen:
+                        continue
+                    jpeg, seen = self._jpeg, self._jpeg_seq
+                handler.wfile.write(b"--" + self.BOUNDARY + b"\r\n"
+                                    b"Content-Type: image/jpeg\r\n"
+                                    + f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                                    + jpeg + b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def close(self):
+        self._stop.set()
+        self._inbox.close()
+        with self._cond:
+            self._cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
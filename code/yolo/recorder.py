@@ -0,0 +1,90 @@
+# recorder.py
+
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+import cv2
+
+class Recorder:
+    """
+    Session video recorder that never blocks the control loop: write()
+    offers a frame to a bounded queue and counts it as dropped when the
+    queue is full; a background thread encodes, starting a new file every
+    segment_s seconds of video (session-<start>-<n>.avi).
+    """
+
+    def __init__(self, out_dir, fps: float = 20.0, fourcc: str = "XVID",
+                 segment_s: float = 180.0, queue_size: int = 64):
+        self.out_dir    = Path(out_dir)
+        self.fps        = fps
+        self.fourcc     = cv2.VideoWriter_fourcc(*fourcc)
+        self.segment_n  = max(1, int(segment_s * fps))   # frames per file
+        self.session    = time.strftime("%Y%m%d-%H%M%S")
+        self.offered    = 0
+        self.dropped    = 0
+        self.written    = 0
+        self.files      = 0
+        self._queue     = queue.Queue(maxsize=queue_size)
+        self._writer    = None
+        self._size      = None
+        self._in_file   = 0
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="recorder", daemon=True)
+        self._thread.start()
+        logging.info(f"Recording to {self.out_dir}/session-{self.session}-*.avi "
+                     f"({fps:g} FPS, {segment_s:g} s per file)")
+
+    def write(self, frame):
+        """Queue a frame for encoding; drops it (and counts) if the encoder lags."""
+        self.offered += 1
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self, size):
+        self.files  += 1
+        path = self.out_dir / f"session-{self.session}-{self.files:03d}.avi"
+        self._writer  = cv2.VideoWriter(str(path), self.fourcc, self.fps, size)
+        self._size    = size
+        self._in_file = 0
+        if not self._writer.isOpened():
+            raise IOError(f"Cannot open video writer for {path}")
+        logging.info(f"Recording {path}")
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+            logging.info(f"Recorder: {self.written} frames written, {self.dropped}/{self.offered} "
+                         f"dropped (queue full) in {self.files} file(s)")
+
+    def _loop(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            try:
+                if self._in_file >= self.segment_n:
+                    self._close_file()
+                size = (frame.shape[1], frame.shape[0])
+                if self._writer is None:
+                    self._open(size)
+                if size != self._size:
+                    frame = cv2.resize(frame, self._size)
+                self._writer.write(frame)
+                self.written  += 1
+                self._in_file += 1
+            except Exception:
+                logging.exception("Recorder failed; recording stopped")
+                break
+        self._close_file()
+
+    def close(self):
+        """Flush queued frames, finish the current file and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10.0)
@@ -1,9 +1,33 @@
 import RPi.GPIO as GPIO
 import time
 import logging
-from config import SENSOR_FRONT_PINS, SENSOR_REAR_PINS, SENSOR_TIMEOUT_S
+import threading
+from config import (SENSOR_FRONT_PINS, SENSOR_REAR_PINS, SENSOR_TIMEOUT_S, SENSOR_CYCLE_S,
+                    SENSOR_MAX_AGE)
+
+class _Echo:
+    """Edge-timing state of one HC-SR04 (written by the GPIO callback thread)."""
+
+    def __init__(self, name: str, trig: int, echo: int):
+        self.name    = name
+        self.trig    = trig
+        self.echo    = echo
+        self.armed   = False   # trigger sent, edges expected
+        self.rise    = None    # perf_counter() of the rising edge
+        self.width   = None    # echo pulse length (s)
+        self.done    = threading.Event()
+        self.reading = (None, 0.0)   # (cm or None, time.monotonic())
 
 class Sensor:
+    """
+    Background HC-SR04 measurement engine for the front and rear sensors.
+    A thread triggers them in turn, one every SENSOR_CYCLE_S, and the echo
+    pulse is timed by GPIO edge callbacks instead of busy-waiting on
+    GPIO.input(). Each sensor's latest distance and its time.monotonic()
+    stamp are kept in its `reading`; front()/rear() only look them up,
+    so the control loop never waits on a measurement.
+    """
+
     def __init__(self):
         front_trig, front_echo = SENSOR_FRONT_PINS
         rear_trig, rear_echo   = SENSOR_REAR_PINS
@@ -17,31 +41,72 @@ class Sensor:
         GPIO.output(rear_trig,  False)
         time.sleep(2)
 
-        self.front_trig = front_trig
-        self.front_echo = front_echo
-        self.rear_trig  = rear_trig
-        self.rear_echo  = rear_echo
+        self.sensors  = [_Echo("front", front_trig, front_echo),
+                         _Echo("rear",  rear_trig,  rear_echo)]
+        self._by_echo = {s.echo: s for s in self.sensors}
+        self.timeouts = 0
+        self._stop    = threading.Event()
+        for s in self.sensors:
+            GPIO.add_event_detect(s.echo, GPIO.BOTH, callback=self._edge)
+        self._thread = threading.Thread(target=self._loop, name="ultrasonic", daemon=True)
+        self._thread.start()
+
+    def _edge(self, channel):
+        # GPIO callback thread: first edge after the trigger is the rise
+        t = time.perf_counter()
+        s = self._by_echo[channel]
+        if not s.armed:
+            return
+        if s.rise is None:
+            s.rise = t
+        else:
+            s.width = t - s.rise
+            s.armed = False
+            s.done.set()
 
-    def _measure(self, trig, echo):
-        GPIO.output(trig, True)
+    def _measure(self, s: _Echo):
+        s.rise, s.width = None, None
+        s.done.clear()
+        s.armed = True
+        GPIO.output(s.trig, True)
         time.sleep(1e-5)
-        GPIO.output(trig, False)
-
-        start = time.time()
-        while GPIO.input(echo) == 0:
-            if time.time() - start > SENSOR_TIMEOUT_S:
-                logging.warning("Sensor timeout")
-                return None
-        t0 = time.time()
-        while GPIO.input(echo) == 1:
-            if time.time() - t0 > SENSOR_TIMEOUT_S:
-                logging.warning("Sensor timeout")
-                return None
-        t1 = time.time()
-        return (t1 - t0) * 17150  # cm
+        GPIO.output(s.trig, False)
+
+        # echo starts within SENSOR_TIMEOUT_S and lasts at most as long
+        if not s.done.wait(2 * SENSOR_TIMEOUT_S) or s.width > SENSOR_TIMEOUT_S:
+            s.armed = False
+            self.timeouts += 1
+            return None
+        return s.width * 17150  # cm
+
+    def _loop(self):
+        while not self._stop.is_set():
+            for s in self.sensors:
+                start     = time.monotonic()
+                s.reading = (self._measure(s), time.monotonic())
+                # let the echoes die out before the next trigger
+                self._stop.wait(max(0.0, SENSOR_CYCLE_S - (time.monotonic() - start)))
+
+    def _latest(self, s: _Echo):
+        """
+        Newest distance (cm); inf if that measurement got no echo in time
+        (nothing in range), None if there is none newer than SENSOR_MAX_AGE.
+        """
+        cm, t = s.reading
+        if time.monotonic() - t > SENSOR_MAX_AGE:
+            return None
+        return float("inf") if cm is None else cm
 
     def front(self):
-        return self._measure(self.front_trig, self.front_echo)
+        return self._latest(self.sensors[0])
 
     def rear(self):
-        return self._measure(self.rear_trig, self.rear_echo)
\ No newline at end of file
+        return self._latest(self.sensors[1])
+
+    def stop(self):
+        """Stop the measurement thread and edge detection (before GPIO.cleanup)."""
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        for s in self.sensors:
+            GPIO.remove_event_detect(s.echo)
+        logging.info(f"Ultrasonic: {self.timeouts} timeouts")
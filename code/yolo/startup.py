@@ -0,0 +1,42 @@
+# startup.py
+
+import time
+import logging
+from contextlib import contextmanager
+
+class StartupTimer:
+    """
+    Phase-by-phase startup breakdown. Phases are timed with phase(),
+    milestones (e.g. first control command) are marked relative to t0,
+    and report() logs everything once.
+    """
+
+    def __init__(self, t0: float = None):
+        self.t0         = time.perf_counter() if t0 is None else t0
+        self.phases     = []
+        self.milestones = []
+        self.reported   = False
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def add(self, name: str, seconds: float):
+        """Record a phase measured elsewhere (e.g. module imports)."""
+        self.phases.append((name, seconds))
+
+    def mark(self, name: str):
+        """Record a milestone at the current time since t0."""
+        self.milestones.append((name, time.perf_counter() - self.t0))
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        lines = [f"  {name:<24} {1000*dt:8.1f} ms" for name, dt in self.phases]
+        lines += [f"  @ {name:<22} {1000*t:8.1f} ms" for name, t in self.milestones]
+        logging.info("Startup timing:\n" + "\n".join(lines))
@@ -1,46 +1,169 @@
 import cv2
 import time
 import logging
-from ultralytics import YOLO
+import numpy as np
 from statistics import median
 from collections import deque
+from detection import Detection
+from backend   import make_backend
+from flow      import FlowTracker
+from associate import TargetLock
+from config    import (
+    DETECTOR_BACKEND, DETECTOR_MODEL_PATH, DETECTOR_ONNX_PATH, DETECTOR_INT8_PATH,
+    DETECTOR_IMGSZ, DETECTOR_CONF, DETECTOR_IOU, DETECTOR_THREADS,
+    DETECTOR_WARMUP, DETECTOR_CACHE_DIR, DETECTOR_PREPARE, CAMERA_RESOLUTION,
+    HYBRID_ENABLED, HYBRID_DETECT_EVERY, HYBRID_MIN_QUALITY, HYBRID_MIN_POINTS,
+    HYBRID_FB_MAX_PX, CROP_ENABLED, CROP_IMGSZ, CROP_PAD, CROP_MIN_SIZE,
+    LOCK_IOU_WEIGHT, LOCK_DIST_WEIGHT, LOCK_MAX_COST, LOCK_MAX_MISSED, LOCK_HISTORY,
+)
 
 class Yolov8n:
-    def __init__(self, model_path='/home/user/Pilot_Fish/Versão_Yolo/best.pt', fps_window_s=10.0):
-        self.model = YOLO(model_path)
+    def __init__(self, backend=DETECTOR_BACKEND, model_path=None, fps_window_s=10.0,
+                 hybrid=HYBRID_ENABLED, detect_every=HYBRID_DETECT_EVERY,
+                 min_quality=HYBRID_MIN_QUALITY, crop=CROP_ENABLED):
+        if model_path is None:
+            model_path = {
+                "onnx":      DETECTOR_ONNX_PATH,
+                "onnx_int8": DETECTOR_INT8_PATH,
+            }.get(backend, DETECTOR_MODEL_PATH)
+        self.backend = make_backend(backend, model_path, DETECTOR_CONF, DETECTOR_IOU,
+                                    DETECTOR_IMGSZ, DETECTOR_THREADS,
+                                    DETECTOR_CACHE_DIR, DETECTOR_PREPARE)
+        logging.info(f"Detector backend: {backend} ({model_path})")
         self.prev_time = time.time()
         self.fps_history = deque()
         self.fps_window_s = fps_window_s
         self.last_median_log = self.prev_time
         self.last_detection = None
-        
-    def track_frame(self, frame):
-        results = self.model(frame)
-
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                cx = int((x1 + x2) / 2)
-                cy = int((y1 + y2) / 2)
-
-                self.last_detection = {
-                    'class': cls,
-                    'confidence': conf,
-                    'bbox': (x1, y1, x2, y2),
-                    'center': (cx, cy)
-                }
+        self._first_frame   = True
 
+        # Target lock: which of the frame's boxes is "our" fish
+        self.lock = TargetLock(LOCK_IOU_WEIGHT, LOCK_DIST_WEIGHT, LOCK_MAX_COST,
+                               LOCK_MAX_MISSED, LOCK_HISTORY)
+
+        # Hybrid mode: detector every N frames, optical flow in between
+        self.flow         = FlowTracker(min_points=HYBRID_MIN_POINTS,
+                                        fb_max_px=HYBRID_FB_MAX_PX) if hybrid else None
+        self.detect_every = max(1, detect_every)
+        self.min_quality  = min_quality
+        self._since_detect = 0
+        self._det_conf     = 0.0
+
+        # Crop mode: small-input detector pass around the last box
+        self.crop          = crop
+        self.crop_imgsz    = CROP_IMGSZ
+        if crop and getattr(self.backend, "dynamic", True) is False:
+            logging.warning("Crop mode on a static-shape ONNX model: crops are resized "
+                            f"to {self.backend.size}, re-export with dynamic axes")
+
+        # path counters, logged and reset every fps window
+        self.frames        = 0
+        self.detector_runs = 0
+        self.flow_runs     = 0
+        self.flow_lost     = 0
+        self.crop_runs     = 0
+        self.crop_misses   = 0
+
+    def warmup(self, runs: int = DETECTOR_WARMUP):
+        """
+        Run the detector on a blank camera-sized frame so the first real
+        frames don't pay for lazy allocation / kernel selection.
+        """
+        if runs <= 0:
+            return
+        w, h  = CAMERA_RESOLUTION
+        blank = np.zeros((h, w, 3), np.uint8)
+        start = time.perf_counter()
+        times = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            self.backend.infer(blank)
+            if self.crop:
+                self.backend.infer(blank[:CROP_MIN_SIZE, :CROP_MIN_SIZE], self.crop_imgsz)
+            times.append(time.perf_counter() - t)
+        logging.info(
+            f"Detector warm-up: {runs} runs in {1000*(time.perf_counter() - start):.0f} ms "
+            f"(first {1000*times[0]:.0f} ms, last {1000*times[-1]:.0f} ms)"
+        )
+
+    @staticmethod
+    def _crop_window(bbox, w: int, h: int):
+        """Square window (x0, y0, x1, y1) around bbox, shifted inside the frame."""
+        bx, by, bw, bh = bbox
+        side = int(min(max(CROP_MIN_SIZE, (1 + 2 * CROP_PAD) * max(bw, bh)), w, h))
+        x0 = min(max(int(bx + bw / 2 - side / 2), 0), w - side)
+        y0 = min(max(int(by + bh / 2 - side / 2), 0), h - side)
+        return x0, y0, x0 + side, y0 + side
+
+    def _detect(self, frame):
+        """
+        Detector pass; (boxes, scores, classes) in frame pixels. With crop
+        mode and a previous box, try the window around it first.
+        """
+        h, w = frame.shape[:2]
+        if self.crop and self.last_detection:
+            x0, y0, x1, y1 = self._crop_window(self.last_detection.bbox, w, h)
+            if x1 - x0 < w or y1 - y0 < h:
+                self.crop_runs += 1
+                boxes, scores, classes = self.backend.infer(frame[y0:y1, x0:x1], self.crop_imgsz)
+                if len(boxes):
+                    boxes[:, [0, 2]] += x0
+                    boxes[:, [1, 3]] += y0
+                    return boxes, scores, classes
+                self.crop_misses += 1
+        return self.backend.infer(frame)
+
+    def track_frame(self, frame, timestamp: float = None):
+        """
+        Returns the locked fish's Detection (also kept as last_detection) or
+        None. In hybrid mode the detector only runs every detect_every
+        frames, or as soon as the optical-flow box is lost or its quality
+        drops below min_quality.
+        """
+        now  = time.time() if timestamp is None else timestamp
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if self.flow else None
+        self.frames += 1
+
+        # 1) cheap path: propagate the last box with optical flow
+        if self.flow and self.last_detection and self._since_detect < self.detect_every:
+            bbox, quality = self.flow.update(gray)
+            if bbox is not None and quality >= self.min_quality:
+                x, y, w, h = bbox
+                self.lock.record((x, y, x + w, y + h), now)
+                self.last_detection = Detection.from_xyxy(
+                    x, y, x + w, y + h, self._det_conf * quality,
+                    self.last_detection.class_id, frame.shape, now, self.lock.track_id
+                )
+                self._since_detect += 1
+                self.flow_runs     += 1
                 return self.last_detection
+            self.flow_lost += 1
 
+        # 2) detector, then pick the locked fish among its boxes
+        start = time.perf_counter()
+        boxes, scores, classes = self._detect(frame)
+        if self._first_frame:
+            self._first_frame = False
+            logging.info(f"First-frame detector latency: {1000*(time.perf_counter() - start):.0f} ms")
+        self.detector_runs += 1
+        self._since_detect  = 1
         self.last_detection = None
-        return None
+        i = self.lock.update(boxes, scores, now)
+        if i is not None:
+            self.last_detection = Detection.from_xyxy(
+                *boxes[i], scores[i], classes[i], frame.shape, now, self.lock.track_id
+            )
+            self._det_conf = self.last_detection.confidence
+            if self.flow and not self.flow.init(gray, self.last_detection.bbox):
+                # nothing to follow: force the detector on the next frame
+                self._since_detect = self.detect_every
+        elif self.flow:
+            self.flow.reset()
+        return self.last_detection
 
     def center(self):
         if self.last_detection:
-            return self.last_detection['center']
+            return self.last_detection.centroid
         else:
             return None
 
@@ -59,6 +182,23 @@ class Yolov8n:
             if vals:
                 med = median(vals)
                 logging.info(f"FPS Medio (últimos {self.fps_window_s}s): {med:.1f}")
+            if self.crop and self.crop_runs:
+                logging.info(
+                    f"Crop detector: {self.crop_runs} runs, {self.crop_misses} "
+                    f"fell back to the full frame"
+                )
+            if self.flow and self.frames:
+                logging.info(
+                    f"Detector: {self.detector_runs}/{self.frames} frames "
+                    f"({100.0*self.detector_runs/self.frames:.1f}%), "
+                    f"optical flow: {self.flow_runs}, flow lost → re-detect: {self.flow_lost}"
+                )
+            self.frames        = 0
+            self.detector_runs = 0
+            self.flow_runs     = 0
+            self.flow_lost     = 0
+            self.crop_runs     = 0
+            self.crop_misses   = 0
             self.last_median_log = now
 
         return inst, med
@@ -3,6 +3,6 @@ from ultralytics import YOLO
 # Carrega o modelo treinado
 model = YOLO('yolov8n.pt')
 
-# Exporta para ONNX
-model.export(format='onnx')
-
+# Exporta para ONNX com eixos dinâmicos, para que o modo crop do detector
+# (detector.crop em config.yaml) rode com entradas menores que 640
+model.export(format='onnx', dynamic=True)
@@ -0,0 +1,166 @@
+# quantize.py
+#
+# INT8 static quantization of the exported YOLOv8n ONNX model, calibrated
+# on the photo datasets captured with photo.py, plus an FP32 vs INT8
+# report (latency, throughput, detection agreement) per lighting condition.
+#
+#   python quantize.py [--model ../best.onnx] [--out ../best.int8.onnx]
+#                      [--calib 64] [--eval 200] [--report quantize_report.json]
+#
+# Yolov8n loads the result with detector.backend: "onnx_int8".
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+YOLO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(YOLO_DIR))
+
+from backend import OnnxBackend
+from config  import (
+    DETECTOR_ONNX_PATH, DETECTOR_INT8_PATH,
+    DETECTOR_CONF, DETECTOR_IOU, DETECTOR_IMGSZ, DETECTOR_THREADS,
+)
+
+DATASETS = ("normal", "light", "shake")
+
+def dataset_images(name: str, limit: int):
+    """Evenly spaced sample of at most `limit` image paths from a dataset."""
+    paths = sorted((YOLO_DIR / name).glob("*.jpg"))
+    if limit and len(paths) > limit:
+        paths = [paths[i] for i in np.linspace(0, len(paths) - 1, limit).astype(int)]
+    return paths
+
+class ImageCalibrationReader:
+    """onnxruntime CalibrationDataReader over the captured datasets."""
+
+    def __init__(self, backend: OnnxBackend, paths):
+        self.backend = backend
+        self.paths   = iter(paths)
+
+    def get_next(self):
+        for path in self.paths:
+            img = cv2.imread(str(path))
+            if img is None:
+                continue
+            tensor, _, _ = self.backend.prepare(img)
+            return {self.backend.input_name: tensor.copy()}
+        return None
+
+def quantize(model: Path, out: Path, calib_per_set: int, exclude_prefix: str):
+    import onnx
+    from onnxruntime.quantization import (
+        quantize_static, QuantFormat, QuantType, CalibrationMethod,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepped = out.with_suffix(".prep.onnx")
+    quant_pre_process(str(model), str(prepped))
+
+    # The Detect head concatenates pixel-scale boxes with 0-1 class scores;
+    # one INT8 scale for both wipes out the scores, so keep it in FP32.
+    excluded = [n.name for n in onnx.load(str(prepped)).graph.node
+                if exclude_prefix and n.name.startswith(exclude_prefix)]
+    print(f"Keeping {len(excluded)} nodes under '{exclude_prefix}' in FP32")
+
+    fp32  = OnnxBackend(model, DETECTOR_CONF, DETECTOR_IOU, DETECTOR_IMGSZ, DETECTOR_THREADS)
+    paths = [p for name in DATASETS for p in dataset_images(name, calib_per_set)]
+    print(f"Calibrating on {len(paths)} images ({calib_per_set} per dataset)...")
+    quantize_static(
+        str(prepped), str(out), ImageCalibrationReader(fp32, paths),
+        quant_format       = QuantFormat.QDQ,
+        activation_type    = QuantType.QUInt8,
+        weight_type        = QuantType.QInt8,
+        per_channel        = True,
+        calibrate_method   = CalibrationMethod.MinMax,
+        nodes_to_exclude   = excluded,
+    )
+    prepped.unlink(missing_ok=True)
+    print(f"Wrote {out} ({out.stat().st_size/1e6:.1f} MB, FP32 {model.stat().st_size/1e6:.1f} MB)")
+
+def evaluate(backend: OnnxBackend, images):
+    """Run backend over images; returns (latencies_ms, best-box centroids or None)."""
+    backend.infer(images[0])  # warm-up
+    lat, centers = [], []
+    for img in images:
+        start = time.perf_counter()
+        boxes, _, _ = backend.infer(img)
+        lat.append((time.perf_counter() - start) * 1000.0)
+        centers.append(((boxes[0, 0] + boxes[0, 2]) / 2, (boxes[0, 1] + boxes[0, 3]) / 2)
+                       if len(boxes) else None)
+    return np.array(lat), centers
+
+def report(model: Path, out: Path, eval_per_set: int, report_path: Path):
+    fp32 = OnnxBackend(model, DETECTOR_CONF, DETECTOR_IOU, DETECTOR_IMGSZ, DETECTOR_THREADS)
+    int8 = OnnxBackend(out,   DETECTOR_CONF, DETECTOR_IOU, DETECTOR_IMGSZ, DETECTOR_THREADS)
+    results = {"fp32_model": str(model), "int8_model": str(out), "datasets": {}}
+
+    print(f"{'dataset':8} {'model':>5} {'p50 ms':>7} {'mean ms':>8} {'fps':>6} "
+          f"{'det %':>6} {'miss %':>7} {'err px':>7} {'p95 px':>7}")
+    for name in DATASETS:
+        images = [img for img in (cv2.imread(str(p)) for p in dataset_images(name, eval_per_set))
+                  if img is not None]
+        if not images:
+            print(f"{name:8} (no images)")
+            continue
+        lat_f, cen_f = evaluate(fp32, images)
+        lat_i, cen_i = evaluate(int8, images)
+
+        both = [(a, b) for a, b in zip(cen_f, cen_i) if a is not None and b is not None]
+        errs = np.array([np.hypot(a[0] - b[0], a[1] - b[1]) for a, b in both])
+        ref  = sum(c is not None for c in cen_f)
+        miss = sum(a is not None and b is None for a, b in zip(cen_f, cen_i))
+        entry = {"frames": len(images)}
+        for key, lat, cen in (("fp32", lat_f, cen_f), ("int8", lat_i, cen_i)):
+            entry[key] = {
+                "latency_p50_ms":  float(np.percentile(lat, 50)),
+                "latency_mean_ms": float(lat.mean()),
+                "throughput_fps":  float(1000.0 / lat.mean()),
+                "detection_rate":  sum(c is not None for c in cen) / len(images),
+            }
+        entry["agreement"] = {
+            "miss_rate":            miss / ref if ref else 0.0,
+            "extra_detections":     sum(a is None and b is not None for a, b in zip(cen_f, cen_i)),
+            "centroid_err_mean_px": float(errs.mean()) if len(errs) else None,
+            "centroid_err_p95_px":  float(np.percentile(errs, 95)) if len(errs) else None,
+        }
+        results["datasets"][name] = entry
+
+        for key in ("fp32", "int8"):
+            e = entry[key]
+            tail = ""
+            if key == "int8":
+                a   = entry["agreement"]
+                err = f"{a['centroid_err_mean_px']:7.2f} {a['centroid_err_p95_px']:7.2f}" \
+                      if len(errs) else f"{'-':>7} {'-':>7}"
+                tail = f" {100*a['miss_rate']:7.1f} {err}"
+            print(f"{name:8} {key:>5} {e['latency_p50_ms']:7.1f} {e['latency_mean_ms']:8.1f} "
+                  f"{e['throughput_fps']:6.1f} {100*e['detection_rate']:6.1f}{tail}")
+
+    report_path.write_text(json.dumps(results, indent=2))
+    print(f"Report written to {report_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 static quantization of the fish detector")
+    parser.add_argument("--model",  type=Path, default=DETECTOR_ONNX_PATH, help="FP32 ONNX model")
+    parser.add_argument("--out",    type=Path, default=DETECTOR_INT8_PATH, help="INT8 ONNX output")
+    parser.add_argument("--calib",  type=int,  default=64,  help="calibration images per dataset")
+    parser.add_argument("--eval",   type=int,  default=200, help="evaluation images per dataset")
+    parser.add_argument("--report", type=Path, default=Path("quantize_report.json"))
+    parser.add_argument("--exclude", default="/model.22/",
+                        help="node-name prefix kept in FP32 (ultralytics Detect head)")
+    parser.add_argument("--skip-quantize", action="store_true",
+                        help="only re-run the FP32 vs INT8 report")
+    args = parser.parse_args()
+
+    if not args.skip_quantize:
+        quantize(args.model, args.out, args.calib, args.exclude)
+    report(args.model, args.out, args.eval, args.report)
+
+if __name__ == "__main__":
+    main()